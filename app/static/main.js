@@ -6,7 +6,6 @@ document.addEventListener("DOMContentLoaded", function () {
         const calendarEl = document.getElementById('calendar');
         let availabilityMode = false;
         let availabilityEvents = [];
-        let events = [];
 
         // Helper function to format date consistently
         function formatDateForBackend(date) {
@@ -81,18 +80,28 @@ document.addEventListener("DOMContentLoaded", function () {
                     console.log(info.event.extendedProps)
                     info.event.remove();
                 } else if (info.event.extendedProps.eventId) {
+                    const payload = { event_id: info.event.extendedProps.eventId };
+
+                    // Recurring events: the whole series, else only this occurrence, else nothing.
+                    if (info.event.extendedProps.rrule && !confirm('Delete every occurrence of this event?')) {
+                        if (!confirm('Delete only the occurrence on ' + info.event.startStr + '?')) {
+                            return;
+                        }
+                        payload.date = info.event.startStr;
+                    }
+
                     fetch("/events/remove", {
                         method: "POST",
                         headers: {
                             "Content-Type": "application/json"
                         },
-                        body: JSON.stringify({ event_id: info.event.extendedProps.eventId })
+                        body: JSON.stringify(payload)
                     })
                     .then(res => res.json())
                     .then(data => {
                         console.log("Remove response:", data);
                         if (data.status === "success") {
-                            info.event.remove();
+                            calendar.refetchEvents();
                         }
                     });
                 }
@@ -150,21 +159,22 @@ document.addEventListener("DOMContentLoaded", function () {
             }
         });
 
-        fetch("/events/get")
-        .then(res => res.json())
-        .then(data => {
-            data.forEach(ev => {
-                const eventObject = {
+        // Only the visible range is requested, recurring events are expanded server side.
+        calendar.addEventSource(function (info, success, failure) {
+            const params = new URLSearchParams({ start: info.startStr, end: info.endStr });
+
+            fetch(`/events/get?${params}`)
+            .then(res => res.json())
+            .then(data => {
+                success(data.map(ev => ({
                     start: ev.start_date,
                     title: ev.title,
                     allDay: true,
-                    extendedProps: { eventId: ev.id }
-                }
-
-                console.log('Adding event:', eventObject);
-                calendar.addEvent(eventObject);
-            });
-            loadAvailabilityText(data);
+                    extendedProps: { eventId: ev.id, rrule: ev.rrule }
+                })));
+                loadAvailabilityText(data);
+            })
+            .catch(failure);
         });
 
         // Load events from backend
@@ -190,6 +200,8 @@ document.addEventListener("DOMContentLoaded", function () {
         const setEventBtn = document.querySelector('#calendar-add-btn');
         const titleInput = document.querySelector('#event-title-input');
         const dateInput = document.querySelector('#date-block-add');
+        const repeatInput = document.querySelector('#event-repeat-input');
+        const untilInput = document.querySelector('#event-until-input');
         const modal = document.querySelector('#calendar-add-event-popup');
 
         if (setEventBtn) {
@@ -208,27 +220,32 @@ document.addEventListener("DOMContentLoaded", function () {
                         allDay: true
                     }
 
-                    calendar.addEvent(eventObject);
-        
+                    // Stored as one row with an RRULE, e.g. FREQ=WEEKLY;UNTIL=20261231
+                    if (repeatInput && repeatInput.value) {
+                        eventObject.rrule = `FREQ=${repeatInput.value}`;
+                        if (untilInput.value) {
+                            eventObject.rrule += `;UNTIL=${untilInput.value.replaceAll('-', '')}`;
+                        }
+                    }
+
                     // Close modal and reset form
                     modal.classList.remove('show');
                     titleInput.value = '';
                     dateInput.value = '';
-                    
-                    events.push(eventObject);
-
-                    console.log(events);
+                    if (repeatInput) repeatInput.value = '';
+                    if (untilInput) untilInput.value = '';
 
                     fetch("/events/save", {
                         method: "POST",
                         headers: {
                             "Content-Type": "application/json"
                         },
-                        body: JSON.stringify({ events: events })
+                        body: JSON.stringify({ events: [eventObject] })
                     })
                     .then(res => res.json())
                     .then(data => {
                         console.log("Save response:", data);
+                        calendar.refetchEvents();
                     });
                 }
             });        
@@ -367,18 +384,20 @@ document.addEventListener("DOMContentLoaded", function () {
                         });
                     });
 
-                    fetch(`/view-user-events?user_id=${userId}`)
-                    .then(response => response.json())
-                    .then(data => {
-                        data.forEach(ev => {
-                            const eventObject = {
-                                start: new Date(ev.start_date),
+                    calendar.addEventSource(function (info, success, failure) {
+                        const params = new URLSearchParams({ user_id: userId, start: info.startStr, end: info.endStr });
+
+                        fetch(`/view-user-events?${params}`)
+                        .then(response => response.json())
+                        .then(data => {
+                            success(data.map(ev => ({
+                                start: ev.start_date,
                                 title: ev.title,
                                 allDay: true,
                                 extendedProps: { eventId: ev.id }
-                            };
-                            calendar.addEvent(eventObject);
-                        });
+                            })));
+                        })
+                        .catch(failure);
                     });
                     calendar.render();
                 }
@@ -552,25 +571,23 @@ document.addEventListener("DOMContentLoaded", function () {
             
             if (btn) {
                 
-                console.log(btn.dataset.items);
-
-                const items = JSON.parse(btn.dataset.items);
-
                 const tbody = document.querySelector("#invoice-details-popup tbody");
                 tbody.innerHTML = ""
-        
-                let total = 0;
-                
-                items.forEach(item => {
-                    const row = document.createElement("tr");
-                    row.innerHTML = `
-                        <td style="padding: 8px; color: var(--text-color-primary)">${item.name}</td>
-                        <td style="padding: 8px; text-align: right; color: var(--text-color-primary)">${item.quantity}</td>
-                        <td style="padding: 8px; text-align: right; color: var(--text-color-primary)">$${item.price}</td>
-                        `;
-                    tbody.appendChild(row);
-                    total += item.price * item.quantity;
-                });
+
+                // Line items are fetched on demand, the listing only carries the stored total
+                fetch(`/invoices/${btn.dataset.number}/items`)
+                    .then(response => response.json())
+                    .then(data => {
+                        data.items.forEach(item => {
+                            const row = document.createElement("tr");
+                            row.innerHTML = `
+                                <td style="padding: 8px; color: var(--text-color-primary)">${item.name}</td>
+                                <td style="padding: 8px; text-align: right; color: var(--text-color-primary)">${item.quantity}</td>
+                                <td style="padding: 8px; text-align: right; color: var(--text-color-primary)">$${item.price}</td>
+                                `;
+                            tbody.appendChild(row);
+                        });
+                    });
         
                 document.querySelector('#status-notes').innerHTML = `
                     <p><strong>Status:</strong> <span style="color: ${btn.dataset.status === 'paid' ? 'green' : 'yellow'};">${btn.dataset.status.charAt(0).toUpperCase() + btn.dataset.status.slice(1)}</span></p>
@@ -586,7 +603,7 @@ document.addEventListener("DOMContentLoaded", function () {
                 document.querySelector('#invoice-number').textContent = `Invoice #: ${btn.dataset.number}`;
                 document.querySelector('.invoice-details-title').textContent = `View ${btn.dataset.name} invoice`;
 
-                document.querySelector("#invoice-details-popup tfoot td:last-child").innerHTML = `<strong>$${total.toFixed(2)}</strong>`;
+                document.querySelector("#invoice-details-popup tfoot td:last-child").innerHTML = `<strong>$${btn.dataset.total}</strong>`;
                 
 
                 if (btn.dataset.root === "true") {
@@ -838,7 +855,7 @@ document.addEventListener("DOMContentLoaded", function () {
                                     data-name="${inv.title}"
                                     data-date="${inv.date_created}"
                                     data-status="${inv.status}"
-                                    data-items='${JSON.stringify(inv.items_json)}'
+                                    data-total="${inv.total}"
                                     data-from="${inv.from || ''}"
                                     data-number="${inv.id}"
                                     data-note="${inv.note}"
@@ -862,7 +879,7 @@ document.addEventListener("DOMContentLoaded", function () {
                                 data-name="${inv.title}"
                                 data-date="${inv.date_created}"
                                 data-status="${inv.status}"
-                                data-items='${JSON.stringify(inv.items_json)}'
+                                data-total="${inv.total}"
                                 data-from="${inv.from || ''}"
                                 data-number="${inv.id}"
                                 data-note="${inv.note}">View details</button>
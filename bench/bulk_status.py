@@ -0,0 +1,63 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from sqlalchemy import update
+
+from bench.seed import ADMIN_EMAIL, BENCH_PASSWORD, seed_data
+
+
+def fresh_app(invoices, seed):
+    from main import create_app
+    from database.db import db
+    from database.models.invoices import Invoices
+
+    workdir = tempfile.mkdtemp(prefix='team-dashboard-bulk-')
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+                      'SECRET_KEY': 'bench'})
+
+    users = 20
+    with app.app_context():
+        seed_data(users=users, invoices_per_user=-(-invoices // users), seed=seed)
+        db.session.execute(update(Invoices).values(status='requested'))
+        db.session.commit()
+        invoice_ids = [invoice_id for (invoice_id,) in db.session.query(Invoices.id).limit(invoices)]
+
+    client = app.test_client()
+    client.post('/login', data={'email': ADMIN_EMAIL, 'password': BENCH_PASSWORD})
+
+    return client, invoice_ids
+
+
+# Marks `--invoices` invoices as paid once through the bulk endpoint and once one request per invoice.
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark bulk vs single invoice status updates.')
+    parser.add_argument('--invoices', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    client, invoice_ids = fresh_app(args.invoices, args.seed)
+    started = time.perf_counter()
+    response = client.post('/invoices/update_status/bulk', json={'invoice_ids': invoice_ids, 'status': 'paid'})
+    bulk_seconds = time.perf_counter() - started
+    updated = sum(1 for result in response.get_json()['results'].values() if result == 'updated')
+
+    client, invoice_ids = fresh_app(args.invoices, args.seed)
+    started = time.perf_counter()
+    for invoice_id in invoice_ids:
+        client.post(f'/invoices/update_status?invoice_id={invoice_id}&status=paid')
+    single_seconds = time.perf_counter() - started
+
+    print(json.dumps({
+        'invoices': len(invoice_ids),
+        'bulk_updated': updated,
+        'bulk_ms': round(bulk_seconds * 1000, 1),
+        'single_requests_ms': round(single_seconds * 1000, 1),
+        'speedup': round(single_seconds / bulk_seconds, 1),
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
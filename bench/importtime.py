@@ -0,0 +1,62 @@
+import argparse
+import json
+import re
+import subprocess
+import sys
+
+from bench.startup import WATCHED_MODULES, add_budget_arguments, check_budget
+
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+# Parses `python -X importtime` output into {module: (self_us, cumulative_us, depth)}.
+def import_times(target):
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {target}'],
+                            capture_output=True, text=True, check=True)
+    modules = {}
+
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules[name] = (int(self_us), int(cumulative_us), len(indent) // 2)
+
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check the import time budget of the app using -X importtime.')
+    parser.add_argument('--target', default='main')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15, help='how many direct imports to list')
+    add_budget_arguments(parser, 'IMPORT_BUDGET_MS')
+    args = parser.parse_args()
+
+    runs = [import_times(args.target) for _ in range(args.runs)]
+    median = sorted(run[args.target][1] for run in runs)[len(runs) // 2] / 1000
+
+    last = runs[-1]
+    direct = sorted(((name, cumulative) for name, (_, cumulative, depth) in last.items() if depth == 1),
+                    key=lambda item: item[1], reverse=True)
+    eager = sorted({name for run in runs for name in run if name.split('.')[0] in WATCHED_MODULES})
+
+    report = {
+        'target': args.target,
+        'median_import_ms': round(median, 1),
+        'budget_ms': args.budget_ms,
+        'slowest_direct_imports_ms': {name: round(us / 1000, 1) for name, us in direct[:args.top]},
+        'eagerly_loaded': eager,
+    }
+    print(json.dumps(report, indent=2))
+
+    failures = check_budget(report, 'median_import_ms', args)
+    for line in failures:
+        print(f'OVER BUDGET {line}', file=sys.stderr)
+
+    if failures or eager:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,233 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import HTTPCookieProcessor, HTTPRedirectHandler, Request, build_opener
+
+from bench.seed import ADMIN_EMAIL, BENCH_PASSWORD, seed_data
+
+
+# (name, method, path, kwargs) - `{invoice_id}` is filled in from the seeded data.
+def bench_routes(invoice_id):
+    return [
+        ('login', 'POST', '/login', {'data': {'email': ADMIN_EMAIL, 'password': BENCH_PASSWORD}}),
+        ('team', 'GET', '/team', {}),
+        ('admin', 'GET', '/admin', {}),
+        ('invoices_filter', 'GET', '/invoices/filter?status=all', {'headers': {'Referer': '/admin'}}),
+        ('events_get', 'GET', '/events/get?start=2024-01-01&end=2024-12-31', {}),
+        ('availability_save', 'POST', '/availability/save',
+         {'json': {'events': [{'start': f'2024-03-{day:02d}T00:00:00'} for day in range(1, 11)]}}),
+        ('download_invoice_pdf', 'GET', f'/download-invoice-pdf/{invoice_id}', {}),
+    ]
+
+
+def percentile(samples, pct):
+    if not samples:
+        return None
+
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def summarize(latencies, errors, elapsed):
+    report = {}
+    latencies = latencies | {'all': [sample for samples in latencies.values() for sample in samples]}
+    errors = errors | {'all': sum(errors.values())}
+
+    for name, samples in latencies.items():
+        report[name] = {
+            'requests': len(samples),
+            'errors': errors.get(name, 0),
+            'throughput_rps': round(len(samples) / elapsed, 2) if elapsed else None,
+            'p50_ms': round(percentile(samples, 50) * 1000, 3),
+            'p95_ms': round(percentile(samples, 95) * 1000, 3),
+            'p99_ms': round(percentile(samples, 99) * 1000, 3),
+        }
+
+    return report
+
+
+def run_test_client(app, routes, iterations):
+    client = app.test_client()
+    client.post('/login', data=routes[0][3]['data'])
+
+    latencies = {name: [] for name, *_ in routes}
+    errors = {}
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for name, method, path, kwargs in routes:
+            t0 = time.perf_counter()
+            response = client.open(path, method=method, **kwargs)
+            latencies[name].append(time.perf_counter() - t0)
+
+            if response.status_code >= 400:
+                errors[name] = errors.get(name, 0) + 1
+
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+class NoRedirect(HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+def _http_request(opener, base_url, method, path, kwargs):
+    headers = dict(kwargs.get('headers', {}))
+    body = None
+
+    if 'data' in kwargs:
+        body = urlencode(kwargs['data']).encode()
+        headers['Content-Type'] = 'application/x-www-form-urlencoded'
+    elif 'json' in kwargs:
+        body = json.dumps(kwargs['json']).encode()
+        headers['Content-Type'] = 'application/json'
+
+    if 'Referer' in headers:
+        headers['Referer'] = base_url + headers['Referer']
+
+    try:
+        with opener.open(Request(base_url + path, data=body, headers=headers, method=method)) as response:
+            response.read()
+            return response.status
+    except HTTPError as e:
+        return e.code
+
+
+def run_http_load(app, routes, iterations, concurrency):
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+    base_url = f'http://127.0.0.1:{server.server_port}'
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    latencies = {name: [] for name, *_ in routes}
+    errors = {}
+    lock = threading.Lock()
+
+    def worker(_):
+        opener = build_opener(HTTPCookieProcessor(CookieJar()), NoRedirect())
+        _http_request(opener, base_url, 'POST', '/login', routes[0][3])
+
+        for _ in range(iterations):
+            for name, method, path, kwargs in routes:
+                t0 = time.perf_counter()
+                status = _http_request(opener, base_url, method, path, kwargs)
+                elapsed = time.perf_counter() - t0
+
+                with lock:
+                    latencies[name].append(elapsed)
+                    if status >= 400:
+                        errors[name] = errors.get(name, 0) + 1
+
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(worker, range(concurrency)))
+    finally:
+        server.shutdown()
+
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# Returns every route/metric whose p95 got slower than `tolerance` compared to a previous report.
+def compare_reports(baseline, current, tolerance):
+    regressions = []
+
+    for mode in ('test_client', 'http'):
+        for name, stats in current.get(mode, {}).items():
+            previous = baseline.get(mode, {}).get(name)
+
+            if not previous or not previous['p95_ms']:
+                continue
+
+            change = (stats['p95_ms'] - previous['p95_ms']) / previous['p95_ms']
+            if change > tolerance:
+                regressions.append(f"{mode}/{name}: p95 {previous['p95_ms']}ms -> {stats['p95_ms']}ms (+{change:.0%})")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the main Team Dashboard routes.')
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--invoices-per-user', type=int, default=10)
+    parser.add_argument('--items-per-invoice', type=int, default=5)
+    parser.add_argument('--iterations', type=int, default=20, help='passes over every route per client')
+    parser.add_argument('--concurrency', type=int, default=8, help='parallel HTTP clients, 0 skips the HTTP run')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='write the JSON report to this file')
+    parser.add_argument('--compare', help='previous JSON report to check for p95 regressions')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed p95 slowdown, 0.2 = 20%%')
+    args = parser.parse_args()
+
+    from main import create_app
+
+    workdir = tempfile.mkdtemp(prefix='team-dashboard-bench-')
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+                      'SECRET_KEY': 'bench'})
+
+    with app.app_context():
+        seeded = seed_data(users=args.users,
+                           invoices_per_user=args.invoices_per_user,
+                           items_per_invoice=args.items_per_invoice,
+                           seed=args.seed)
+
+    routes = bench_routes(seeded['first_invoice_id'])
+
+    report = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'params': vars(args) | {'seeded': seeded},
+    }
+
+    # Keep debug prints from the routes out of the JSON report on stdout.
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        report['test_client'] = run_test_client(app, routes, args.iterations)
+
+        if args.concurrency:
+            report['http'] = run_http_load(app, routes, args.iterations, args.concurrency)
+
+    output = json.dumps(report, indent=2)
+    print(output)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare_reports(json.load(f), report, args.tolerance)
+
+        for line in regressions:
+            print(f'REGRESSION {line}', file=sys.stderr)
+
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+import random
+
+from datetime import date, timedelta
+
+from sqlalchemy import insert, select
+
+from database.db import db
+from database.models.user import User
+from database.models.roles import Roles
+from database.models.invoices import InvoiceItem, Invoices, refresh_invoice_totals
+from database.models.todo import Todo
+from database.models.availability import Availability
+from database.models.events import Event
+from database.models.notification import Notification
+
+from utils import hash_password, generate_random_color, generate_random_icon
+
+BENCH_PASSWORD = 'bench-password'
+ADMIN_EMAIL = 'admin@bench.local'
+
+ROLES = ['admin', 'founder', 'manager', 'user']
+STATUSES = ['requested', 'paid', 'declined']
+
+
+# An executemany with no rows would insert one row of defaults.
+def _insert(model, rows):
+    if rows:
+        db.session.execute(insert(model), rows)
+
+
+# Seeds a reproducible dataset: row counts, ids, dates and prices only depend on `seed`.
+def seed_data(users=50, invoices_per_user=10, items_per_invoice=5, todos_per_user=10,
+              events_per_user=20, availability_per_user=10, notifications_per_user=10, seed=42):
+    rng = random.Random(seed)
+    start = date(2024, 1, 1)
+
+    # Bcrypt is slow on purpose, one hash is shared by every seeded account.
+    password = hash_password(BENCH_PASSWORD)
+
+    existing_roles = set(db.session.scalars(select(Roles.name)))
+    missing_roles = [name for name in ROLES if name not in existing_roles]
+
+    if missing_roles:
+        db.session.execute(insert(Roles), [
+            {'name': name, 'color': generate_random_color(), 'icon': generate_random_icon(), 'root': name in ['admin', 'user']}
+            for name in missing_roles
+        ])
+
+    user_rows = [{'email': ADMIN_EMAIL, 'password': password, 'role': 'admin', 'name': 'bench-admin'}]
+    for i in range(1, users):
+        user_rows.append({'email': f'user{i}@bench.local',
+                          'password': password,
+                          'role': rng.choice(ROLES),
+                          'name': f'bench-{i}',
+                          'invoices_count': invoices_per_user,
+                          'todo_count': todos_per_user})
+    user_rows[0]['invoices_count'] = invoices_per_user
+    user_rows[0]['todo_count'] = todos_per_user
+
+    db.session.execute(insert(User), user_rows)
+    user_ids = db.session.scalars(select(User.id).order_by(User.id)).all()
+
+    _insert(Invoices, [
+        {'title': f'Invoice {user_id}-{n}',
+         'user_id': user_id,
+         'date_created': (start + timedelta(days=rng.randrange(365))).isoformat(),
+         'status': rng.choice(STATUSES),
+         'color': generate_random_color(),
+         'from_address': f'{rng.randrange(1, 999)} Bench Street'}
+        for user_id in user_ids for n in range(invoices_per_user)
+    ])
+    invoice_ids = db.session.scalars(select(Invoices.id).order_by(Invoices.id)).all()
+
+    _insert(InvoiceItem, [
+        {'invoice_id': invoice_id,
+         'name': f'Item {n}',
+         'price': round(rng.uniform(1, 500), 2),
+         'quantity': rng.randrange(1, 10)}
+        for invoice_id in invoice_ids for n in range(items_per_invoice)
+    ])
+    refresh_invoice_totals()
+
+    _insert(Todo, [
+        {'title': f'Todo {n}',
+         'description': 'Benchmark todo',
+         'links': '',
+         'status': rng.choice(['doing', 'done']),
+         'color': generate_random_color(),
+         'deadline': (start + timedelta(days=rng.randrange(365))).isoformat(),
+         'user_id': str(user_id)}
+        for user_id in user_ids for n in range(todos_per_user)
+    ])
+
+    event_days = [start + timedelta(days=rng.randrange(365)) for _ in range(len(user_ids) * events_per_user)]
+    _insert(Event, [
+        {'user_id': user_id,
+         'start_date': event_days[i * events_per_user + n],
+         'last_date': event_days[i * events_per_user + n],
+         'title': f'Event {n}'}
+        for i, user_id in enumerate(user_ids) for n in range(events_per_user)
+    ])
+    # One open-ended weekly series per user, expanded on read.
+    _insert(Event, [
+        {'user_id': user_id, 'start_date': start, 'title': 'Standup', 'rrule': 'FREQ=WEEKLY'}
+        for user_id in user_ids
+    ])
+
+    _insert(Availability, [
+        {'user_id': user_id, 'start_date': start + timedelta(days=n)}
+        for user_id in user_ids for n in range(availability_per_user)
+    ])
+
+    _insert(Notification, [
+        {'user_id': user_id, 'title': f'Notification {n}', 'redirect': '/invoices'}
+        for user_id in user_ids for n in range(notifications_per_user)
+    ])
+
+    db.session.commit()
+
+    return {'users': len(user_ids), 'invoices': len(invoice_ids), 'first_invoice_id': invoice_ids[0] if invoice_ids else None}
@@ -0,0 +1,105 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Runs in a fresh interpreter so nothing is already imported or cached.
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+from main import create_app
+imported = time.perf_counter()
+create_app({config!r})
+created = time.perf_counter()
+print(json.dumps({{
+    'import_ms': (imported - started) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'total_ms': (created - started) * 1000,
+    'loaded': [name for name in {watched!r} if name in sys.modules],
+}}))
+"""
+
+# Modules that must stay out of a cold start, they are loaded by the routes that need them.
+WATCHED_MODULES = ['reportlab', 'random_username', 'cProfile', 'flask_bcrypt']
+
+
+def measure(runs, database_url):
+    config = {'SECRET_KEY': 'startup-bench', 'SQLALCHEMY_DATABASE_URI': database_url}
+    code = PROBE.format(config=config, watched=WATCHED_MODULES)
+
+    samples = []
+    for _ in range(runs):
+        output = subprocess.check_output([sys.executable, '-c', code], text=True)
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+
+    return samples
+
+
+def _env_ms(name):
+    value = os.environ.get(name)
+    return float(value) if value else None
+
+
+# Milliseconds depend on the machine, so there is no fixed default budget. Either set one for this machine
+# (--budget-ms or the environment variable) or save a run with --output and check later ones with --compare.
+def add_budget_arguments(parser, env_var):
+    parser.add_argument('--budget-ms', type=float, default=_env_ms(env_var),
+                        help=f'fail when the median exceeds this (default ${env_var}, unset = no limit)')
+    parser.add_argument('--output', help='write the JSON report to this file')
+    parser.add_argument('--compare', help='previous JSON report from the same machine to check against')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed slowdown against --compare, 0.2 = 20%%')
+
+
+# Writes/compares the report as asked by add_budget_arguments' options, returns the failures for `key`.
+def check_budget(report, key, args):
+    failures = []
+    median = report[key]
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.budget_ms is not None and median > args.budget_ms:
+        failures.append(f'{key} {median}ms is over the budget of {args.budget_ms}ms')
+
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)[key]
+
+        if previous and (median - previous) / previous > args.tolerance:
+            failures.append(f'{key} {previous}ms -> {median}ms (+{(median - previous) / previous:.0%})')
+
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure cold start time of the app factory.')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--database-url', default='sqlite://')
+    add_budget_arguments(parser, 'STARTUP_BUDGET_MS')
+    args = parser.parse_args()
+
+    samples = measure(args.runs, args.database_url)
+    median = sorted(sample['total_ms'] for sample in samples)[len(samples) // 2]
+    loaded = sorted({name for sample in samples for name in sample['loaded']})
+
+    report = {
+        'median_total_ms': round(median, 1),
+        'median_import_ms': round(sorted(s['import_ms'] for s in samples)[len(samples) // 2], 1),
+        'median_create_app_ms': round(sorted(s['create_app_ms'] for s in samples)[len(samples) // 2], 1),
+        'budget_ms': args.budget_ms,
+        'eagerly_loaded': loaded,
+    }
+    print(json.dumps(report, indent=2))
+
+    failures = check_budget(report, 'median_total_ms', args)
+    for line in failures:
+        print(f'OVER BUDGET {line}', file=sys.stderr)
+
+    if failures or loaded:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
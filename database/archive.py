@@ -0,0 +1,188 @@
+import os
+import time
+
+from datetime import date, datetime, timedelta, timezone
+
+from database.backup import database_path
+from database.db import db
+from database.models.archive import invoices_archive, invoice_item_archive, notification_archive, event_archive
+from database.models.events import Event
+from database.models.invoices import InvoiceItem, Invoices
+from database.models.notification import Notification
+from database.models.user import User, touch_notifications
+
+from sqlalchemy import delete, insert, literal, select, update
+
+# Rows older than this many days leave the hot tables, None keeps a table as it is.
+ARCHIVE_INVOICE_DAYS = 365
+ARCHIVE_NOTIFICATION_DAYS = 90
+ARCHIVE_EVENT_DAYS = 365
+# Rows moved per transaction, writers only wait for one batch at a time.
+ARCHIVE_BATCH_SIZE = 1000
+# Requested invoices stay, whatever their age.
+ARCHIVED_INVOICE_STATUSES = ('paid', 'declined')
+
+ARCHIVES = {
+    Invoices.__table__: invoices_archive,
+    InvoiceItem.__table__: invoice_item_archive,
+    Notification.__table__: notification_archive,
+    Event.__table__: event_archive,
+}
+
+
+class ArchiveReport:
+    def __init__(self):
+        self.moved = {'invoices': 0, 'invoice_items': 0, 'notifications': 0, 'events': 0}
+        self.seconds = 0.0
+        self.maintenance_seconds = 0.0
+        self.bytes_before = None
+        self.bytes_after = None
+
+    def as_dict(self):
+        return {
+            'moved': self.moved,
+            'seconds': round(self.seconds, 3),
+            'maintenance_seconds': round(self.maintenance_seconds, 3),
+            'bytes_before': self.bytes_before,
+            'bytes_after': self.bytes_after,
+        }
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+# Size of the SQLite file, None for server databases.
+def _file_size():
+    try:
+        return os.path.getsize(database_path())
+    except ValueError:
+        return None
+
+
+# Copies the rows of `table` with these ids into its archive and deletes them, in the caller's transaction.
+def _move(table, ids, archived_at, column='id'):
+    archive = ARCHIVES[table]
+    names = list(table.columns.keys())
+    where = table.c[column].in_(ids)
+
+    db.session.execute(insert(archive).from_select(
+        names + ['archived_at'],
+        select(*table.columns, literal(archived_at, db.DateTime)).where(where),
+    ))
+
+    return db.session.execute(delete(table).where(where)).rowcount
+
+
+# Picks (id, user_id) of up to batch_size rows matching `condition`, moves them and commits, until none are left.
+def _archive_batches(table, condition, batch_size, move):
+    moved = 0
+
+    while True:
+        rows = db.session.execute(
+            select(table.c.id, table.c.user_id).where(condition).order_by(table.c.id).limit(batch_size)
+        ).all()
+
+        if not rows:
+            return moved
+
+        moved += move([row.id for row in rows], {row.user_id for row in rows})
+        db.session.commit()
+
+
+def archive_invoices(cutoff, batch_size, archived_at, report):
+    table = Invoices.__table__
+
+    # date_created is free text from uploads and imports, only ISO dates can be compared.
+    condition = (table.c.status.in_(ARCHIVED_INVOICE_STATUSES)
+                 & table.c.date_created.like('____-__-__%')
+                 & (table.c.date_created < cutoff.isoformat()))
+
+    def move(ids, user_ids):
+        report.moved['invoice_items'] += _move(InvoiceItem.__table__, ids, archived_at, column='invoice_id')
+        return _move(table, ids, archived_at)
+
+    report.moved['invoices'] += _archive_batches(table, condition, batch_size, move)
+
+
+def archive_notifications(cutoff, batch_size, archived_at, report):
+    table = Notification.__table__
+    condition = table.c.created_at < datetime.combine(cutoff, datetime.min.time())
+
+    # Cached sidebars are keyed by notification_version.
+    def move(ids, user_ids):
+        touch_notifications(user_ids)
+        return _move(table, ids, archived_at)
+
+    report.moved['notifications'] += _archive_batches(table, condition, batch_size, move)
+
+
+def archive_events(cutoff, batch_size, archived_at, report):
+    table = Event.__table__
+    # Series without an end (last_date NULL) always stay.
+    condition = table.c.last_date < cutoff
+
+    # The events leave the calendar feeds, their ETags have to move.
+    def move(ids, user_ids):
+        db.session.execute(
+            update(User).where(User.id.in_(user_ids)).values(calendar_version=User.calendar_version + 1)
+        )
+        return _move(table, ids, archived_at)
+
+    report.moved['events'] += _archive_batches(table, condition, batch_size, move)
+
+
+# VACUUM returns the freed pages to the file system and ANALYZE refreshes the planner statistics.
+# Neither runs inside a transaction, the batches are committed by now. On SQLite VACUUM rewrites the whole
+# file and blocks writers meanwhile.
+def vacuum_analyze(tables):
+    with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        if conn.dialect.name == 'sqlite':
+            conn.exec_driver_sql('VACUUM')
+            conn.exec_driver_sql('ANALYZE')
+        else:
+            for table in tables:
+                conn.exec_driver_sql(f'VACUUM ANALYZE "{table.name}"')
+
+
+# Moves paid/declined invoices (with their items), notifications and finished events older than the given
+# number of days into the *_archive tables. Listings and exports only include them with ?archived=1.
+def archive_old_rows(invoice_days=ARCHIVE_INVOICE_DAYS, notification_days=ARCHIVE_NOTIFICATION_DAYS,
+                     event_days=ARCHIVE_EVENT_DAYS, batch_size=ARCHIVE_BATCH_SIZE, vacuum=True, today=None):
+    today = today or date.today()
+    archived_at = _utcnow()
+    report = ArchiveReport()
+    report.bytes_before = _file_size()
+
+    started = time.perf_counter()
+
+    if invoice_days is not None:
+        archive_invoices(today - timedelta(days=invoice_days), batch_size, archived_at, report)
+    if notification_days is not None:
+        archive_notifications(today - timedelta(days=notification_days), batch_size, archived_at, report)
+    if event_days is not None:
+        archive_events(today - timedelta(days=event_days), batch_size, archived_at, report)
+
+    report.seconds = time.perf_counter() - started
+
+    if vacuum and any(report.moved.values()):
+        started = time.perf_counter()
+        vacuum_analyze(list(ARCHIVES) + list(ARCHIVES.values()))
+        report.maintenance_seconds = time.perf_counter() - started
+
+    report.bytes_after = _file_size()
+    return report
+
+
+# Deleting a user removes their archived rows as well (the archive tables have no foreign keys).
+def delete_user_archives(user_id):
+    own_invoice = select(invoices_archive.c.id).where(
+        invoices_archive.c.user_id == user_id,
+        invoices_archive.c.id == invoice_item_archive.c.invoice_id,
+        invoices_archive.c.archived_at == invoice_item_archive.c.archived_at,
+    ).exists()
+
+    db.session.execute(delete(invoice_item_archive).where(own_invoice))
+
+    for archive in (invoices_archive, notification_archive, event_archive):
+        db.session.execute(delete(archive).where(archive.c.user_id == user_id))
@@ -0,0 +1,249 @@
+import gzip
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+
+from datetime import datetime
+
+from database.db import db
+
+# Pages copied per backup step. Locks are released between steps so writers are never blocked for long;
+# a write through another connection makes SQLite restart the copy, the sleep gives writers room.
+BACKUP_STEP_PAGES = 256
+BACKUP_STEP_SLEEP = 0.005
+# Under constant writes a stepped copy could restart forever, after this many restarts the rest is
+# copied in one step (holding a read lock for that long).
+BACKUP_MAX_RESTARTS = 10
+BACKUP_KEEP = 7
+BACKUP_COMPRESS_LEVEL = 6
+
+
+class _TooManyRestarts(Exception):
+    pass
+
+
+class BackupReport:
+    def __init__(self, path):
+        self.path = path
+        self.pages = 0
+        self.bytes = 0
+        self.compressed_bytes = 0
+        self.seconds = 0.0
+        self.restarts = 0
+        self.removed = []
+
+    def as_dict(self):
+        return {
+            'path': self.path,
+            'pages': self.pages,
+            'bytes': self.bytes,
+            'compressed_bytes': self.compressed_bytes,
+            'seconds': round(self.seconds, 3),
+            'mb_per_second': round(self.bytes / 1e6 / self.seconds, 2) if self.seconds else None,
+            'restarts': self.restarts,
+            'removed': self.removed,
+        }
+
+
+def database_path(bind_key=None):
+    url = db.engines[bind_key].url
+
+    if url.get_backend_name() != 'sqlite' or url.database in (None, '', ':memory:'):
+        raise ValueError('Backups need a file based SQLite database')
+
+    return url.database
+
+
+def _prefix(source):
+    return os.path.splitext(os.path.basename(source))[0] + '-'
+
+
+# Returns (pages, bytes, restarts).
+def _copy(source, target, pages=BACKUP_STEP_PAGES, sleep=BACKUP_STEP_SLEEP):
+    src = sqlite3.connect(source)
+    dst = sqlite3.connect(target)
+    restarts = 0
+    remaining = None
+
+    # `remaining` not going down means a writer changed the source and SQLite started over.
+    def progress(status, left, total):
+        nonlocal restarts, remaining
+
+        if remaining is not None and left >= remaining:
+            restarts += 1
+            if restarts > BACKUP_MAX_RESTARTS:
+                raise _TooManyRestarts()
+
+        remaining = left
+
+    try:
+        try:
+            src.backup(dst, pages=pages, progress=progress, sleep=sleep)
+        except _TooManyRestarts:
+            src.backup(dst, pages=-1)
+
+        page_count = dst.execute('PRAGMA page_count').fetchone()[0]
+        page_size = dst.execute('PRAGMA page_size').fetchone()[0]
+    finally:
+        dst.close()
+        src.close()
+
+    return page_count, page_count * page_size, restarts
+
+
+# Online snapshot via the SQLite backup API into `directory`, gzipped, keeping the newest `keep` files.
+def backup_database(directory, keep=BACKUP_KEEP, pages=BACKUP_STEP_PAGES, sleep=BACKUP_STEP_SLEEP, compress=True):
+    source = database_path()
+    os.makedirs(directory, exist_ok=True)
+
+    name = _prefix(source) + datetime.now().strftime('%Y%m%d-%H%M%S-%f') + ('.db.gz' if compress else '.db')
+    path = os.path.join(directory, name)
+    report = BackupReport(path)
+
+    started = time.perf_counter()
+    fd, snapshot = tempfile.mkstemp(suffix='.db', dir=directory)
+    os.close(fd)
+
+    try:
+        report.pages, report.bytes, report.restarts = _copy(source, snapshot, pages, sleep)
+
+        # Written next to the target and renamed, a half written backup never looks like a finished one.
+        if compress:
+            output = gzip.open(path + '.part', 'wb', compresslevel=BACKUP_COMPRESS_LEVEL)
+        else:
+            output = open(path + '.part', 'wb')
+
+        with open(snapshot, 'rb') as src, output as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+
+        os.replace(path + '.part', path)
+    finally:
+        os.remove(snapshot)
+        if os.path.exists(path + '.part'):
+            os.remove(path + '.part')
+
+    report.seconds = time.perf_counter() - started
+    report.compressed_bytes = os.path.getsize(path)
+    report.removed = rotate_backups(directory, _prefix(source), keep)
+
+    return report
+
+
+def list_backups(directory, prefix):
+    if not os.path.isdir(directory):
+        return []
+
+    # Timestamped names sort chronologically.
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                  if name.startswith(prefix) and name.endswith(('.db', '.db.gz')))
+
+
+def rotate_backups(directory, prefix, keep):
+    backups = list_backups(directory, prefix)
+    removed = backups[:-keep] if keep > 0 else []
+
+    for path in removed:
+        os.remove(path)
+
+    return removed
+
+
+# Uncompressed copy of a backup in a temporary file, the caller removes it.
+# Unreadable archives raise ValueError.
+def _extract(path):
+    fd, target = tempfile.mkstemp(suffix='.db')
+
+    try:
+        with os.fdopen(fd, 'wb') as dst, (gzip.open if path.endswith('.gz') else open)(path, 'rb') as src:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+    except (OSError, EOFError) as e:
+        os.remove(target)
+        raise ValueError(f'Cannot read {path}: {e}')
+
+    return target
+
+
+def _check(path):
+    conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+
+    try:
+        result = [row[0] for row in conn.execute('PRAGMA integrity_check')]
+        tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        counts = {table: conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0] for table in tables}
+    finally:
+        conn.close()
+
+    return result == ['ok'], result, counts
+
+
+# Runs PRAGMA integrity_check on the snapshot and counts rows per table.
+def verify_backup(path):
+    try:
+        snapshot = _extract(path)
+    except ValueError as e:
+        return {'path': path, 'ok': False, 'errors': [str(e)], 'tables': {}}
+
+    try:
+        ok, result, counts = _check(snapshot)
+    except sqlite3.DatabaseError as e:
+        return {'path': path, 'ok': False, 'errors': [str(e)], 'tables': {}}
+    finally:
+        os.remove(snapshot)
+
+    return {'path': path, 'ok': ok, 'errors': [] if ok else result, 'tables': counts}
+
+
+# Verifies the backup, then copies it into `target` with the backup API. The target may be a fresh path
+# or an existing database, which is replaced page by page under SQLite's own locking.
+def restore_backup(path, target):
+    snapshot = _extract(path)
+
+    try:
+        try:
+            ok, result, counts = _check(snapshot)
+        except sqlite3.DatabaseError as e:
+            ok, result = False, [str(e)]
+
+        if not ok:
+            raise ValueError(f'{path} failed the integrity check: {result[:5]}')
+
+        started = time.perf_counter()
+        pages, size, _ = _copy(snapshot, target, pages=-1, sleep=0)
+    finally:
+        os.remove(snapshot)
+
+    return {'path': path, 'target': target, 'pages': pages, 'bytes': size,
+            'seconds': round(time.perf_counter() - started, 3), 'tables': counts}
+
+
+# Refreshes the SQLite file standing in for a read replica from the primary, for trying out replica
+# routing locally; real replicas are kept up to date by the database server.
+def sync_replica(bind_key):
+    pages, size, restarts = _copy(database_path(), database_path(bind_key))
+    return {'pages': pages, 'bytes': size, 'restarts': restarts}
+
+
+def _schema_version(bind_key):
+    with db.engines[bind_key].connect() as conn:
+        return conn.exec_driver_sql('PRAGMA schema_version').scalar()
+
+
+# At startup: a SQLite replica whose schema differs from the primary's (new file, or the primary was
+# upgraded since the last sync) is synced, create_all() and the column upgrades only run on the primary.
+# Returns the sync result, None when nothing was done. Server replicas are left to the database server.
+def prepare_replica(bind_key):
+    try:
+        database_path(None)
+        database_path(bind_key)
+    except ValueError:
+        return None
+
+    if _schema_version(bind_key) == _schema_version(None):
+        return None
+
+    result = sync_replica(bind_key)
+    # Pooled connections may still hold the old schema.
+    db.engines[bind_key].dispose()
+    return result
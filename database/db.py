@@ -1,9 +1,85 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import make_url
+
+from database.routing import RoutingSession, REPLICA_BIND
+
+import os
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+
+# Some hosts still hand out postgres:// URLs, SQLAlchemy only knows the postgresql:// scheme.
+def database_url(url):
+    if url.startswith('postgres://'):
+        return 'postgresql://' + url[len('postgres://'):]
+    return url
+
+
+def is_sqlite(url):
+    return make_url(url).get_backend_name() == 'sqlite'
+
+
+# DATABASE_URL and DATABASE_REPLICA_URL (environment or config) become the primary and the `replica` bind.
+def configure_database(app):
+    config = app.config
+
+    config.setdefault('SQLALCHEMY_DATABASE_URI', os.environ.get('DATABASE_URL', 'sqlite:///database.db'))
+    config['SQLALCHEMY_DATABASE_URI'] = database_url(config['SQLALCHEMY_DATABASE_URI'])
+
+    replica = config.get('DATABASE_REPLICA_URL') or os.environ.get('DATABASE_REPLICA_URL')
+    if replica:
+        config['SQLALCHEMY_BINDS'] = dict(config.get('SQLALCHEMY_BINDS') or {}, **{REPLICA_BIND: database_url(replica)})
+
+    # Server databases drop idle connections, check them out healthy.
+    if not is_sqlite(config['SQLALCHEMY_DATABASE_URI']):
+        options = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+        options.setdefault('pool_pre_ping', True)
+        options.setdefault('pool_recycle', 1800)
+        config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+
+# SQLite only: enforce foreign keys like other databases do, and wait for locks instead of failing.
+def _sqlite_pragmas(app):
+    foreign_keys = app.config.get('SQLITE_FOREIGN_KEYS', True)
+    busy_timeout = int(app.config.get('SQLITE_BUSY_TIMEOUT', 5000))
+
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f'PRAGMA foreign_keys = {"ON" if foreign_keys else "OFF"}')
+        cursor.execute(f'PRAGMA busy_timeout = {busy_timeout}')
+        cursor.close()
+
+    for engine in db.engines.values():
+        if engine.dialect.name == 'sqlite':
+            event.listen(engine, 'connect', on_connect)
 
-db = SQLAlchemy()
 
 def init_db(app):
     db.init_app(app)
     
     with app.app_context():
-        db.create_all()
+        _sqlite_pragmas(app)
+
+
+# Forked workers must not reuse connections opened in the parent (e.g. with a preloaded app).
+def dispose_engines(app):
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+# create_all() never alters existing tables, columns added to a model later are created here.
+# `columns` maps name -> DDL; returns the names that were missing.
+def add_missing_columns(table, columns):
+    existing = {column['name'] for column in inspect(db.engine).get_columns(table)}
+    missing = [name for name in columns if name not in existing]
+
+    if missing:
+        quoted = db.engine.dialect.identifier_preparer.quote(table)
+
+        with db.engine.begin() as conn:
+            for name in missing:
+                conn.execute(text(f'ALTER TABLE {quoted} ADD COLUMN {name} {columns[name]}'))
+
+    return missing
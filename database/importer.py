@@ -0,0 +1,254 @@
+import csv
+import json
+
+from decimal import Decimal, InvalidOperation
+from itertools import groupby, islice
+
+from markupsafe import escape
+from sqlalchemy import case, insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from database.db import db
+from database.types import to_money
+from database.models.user import User
+from database.models.invoices import InvoiceItem, Invoices
+
+from utils import generate_random_color
+
+IMPORT_BATCH_SIZE = 500
+INVOICE_STATUSES = ['requested', 'paid', 'declined']
+# Prices are NUMERIC(12, 2).
+MAX_PRICE = Decimal('1e10')
+
+# Error lists in responses are capped, the count is always exact.
+MAX_REPORTED_ERRORS = 1000
+
+
+class ImportReport:
+    def __init__(self):
+        self.invoices = 0
+        self.items = 0
+        self.error_count = 0
+        self.errors = []
+
+    def error(self, line, message):
+        self.error_count += 1
+
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'error': message})
+
+    def as_dict(self):
+        return {'imported': self.invoices, 'items': self.items,
+                'error_count': self.error_count, 'errors': self.errors}
+
+
+# CSV has one line per item; lines sharing `ref` (or `id`, as written by /export/invoices.csv) form one invoice.
+def read_csv(stream):
+    reader = csv.DictReader(stream)
+    key = 'ref' if 'ref' in (reader.fieldnames or []) else 'id'
+
+    def numbered():
+        for row in reader:
+            yield reader.line_num, row
+
+    for _, lines in groupby(numbered(), key=lambda line: line[1].get(key) or object()):
+        lines = list(lines)
+        line, first = lines[0]
+
+        yield line, {
+            'user_id': first.get('user_id'),
+            'title': first.get('title'),
+            'date_created': first.get('date_created'),
+            'status': first.get('status'),
+            'from_address': first.get('from_address'),
+            'note': first.get('note'),
+            'items': [{'name': row.get('item_name'), 'price': row.get('item_price'), 'quantity': row.get('item_quantity')}
+                      for _, row in lines if row.get('item_name')],
+        }
+
+
+# NDJSON has one invoice object per line with an `items` list, same shape as /export/invoices.ndjson.
+def read_ndjson(stream):
+    for line, text in enumerate(stream, start=1):
+        if text.strip():
+            try:
+                yield line, json.loads(text)
+            except ValueError:
+                yield line, None
+
+
+# A plain JSON array can't be read incrementally, prefer NDJSON for big files.
+def read_json(stream):
+    records = json.load(stream)
+
+    if not isinstance(records, list):
+        raise ValueError('expected an array of invoices')
+
+    for index, record in enumerate(records, start=1):
+        yield index, record
+
+
+READERS = {'csv': read_csv, 'ndjson': read_ndjson, 'json': read_json}
+
+
+# Optional text field: None/missing gives '', anything that isn't a string gives None.
+def _text(value):
+    if value is None:
+        return ''
+
+    return value.strip() if isinstance(value, str) else None
+
+
+def validate_item(item):
+    if not isinstance(item, dict):
+        return None, 'Item is not an object.'
+
+    name = _text(item.get('name'))
+    if not name:
+        return None, 'Item name is required.'
+
+    # bool is an int subclass, `"price": true` is a mistake rather than 1.
+    price, quantity = item.get('price'), item.get('quantity')
+    if isinstance(price, bool) or isinstance(quantity, bool):
+        return None, f'Invalid price or quantity for item {name!r}.'
+
+    try:
+        price = Decimal(str(price))
+        quantity = int(quantity)
+    except (TypeError, ValueError, InvalidOperation):
+        return None, f'Invalid price or quantity for item {name!r}.'
+
+    # NaN and Infinity parse fine but can't be compared, rounded or stored.
+    if not price.is_finite() or not 0 <= price < MAX_PRICE or quantity < 1:
+        return None, f'Invalid item {name!r}.'
+
+    return {'name': escape(name), 'price': to_money(price), 'quantity': quantity}, None
+
+
+# Returns ((invoice, items), None) or (None, error); never raises on malformed input.
+def validate_invoice(record, user_ids):
+    if not isinstance(record, dict):
+        return None, 'Not a valid invoice object.'
+
+    user_id = record.get('user_id')
+    try:
+        user_id = None if isinstance(user_id, (bool, float)) else int(user_id)
+    except (TypeError, ValueError):
+        user_id = None
+
+    if user_id is None:
+        return None, 'Invalid user_id.'
+    if user_id not in user_ids:
+        return None, f'User {user_id} does not exist.'
+
+    title = _text(record.get('title'))
+    date_created = _text(record.get('date_created'))
+    from_address = _text(record.get('from_address'))
+    status = _text(record.get('status'))
+    note = _text(record.get('note'))
+
+    if status == '':
+        status = 'requested'
+
+    if not title or len(title) > 100:
+        return None, 'Title is required (max 100 characters).'
+    if not date_created or len(date_created) > 25:
+        return None, 'date_created is required (max 25 characters).'
+    if not from_address or len(from_address) > 255:
+        return None, 'from_address is required (max 255 characters).'
+    if status not in INVOICE_STATUSES:
+        return None, f'Unknown status {record.get("status")!r}.'
+    if note is None:
+        return None, 'note must be a string.'
+
+    raw_items = record.get('items')
+    if raw_items is not None and not isinstance(raw_items, list):
+        return None, 'items must be a list.'
+
+    items = []
+    for item in raw_items or []:
+        item, error = validate_item(item)
+        if error:
+            return None, error
+
+        items.append(item)
+
+    if not items:
+        return None, 'Invoice has no items.'
+
+    invoice = {
+        'user_id': user_id,
+        'title': escape(title),
+        'date_created': date_created,
+        'status': status,
+        'from_address': from_address,
+        'color': generate_random_color(),
+        'total': sum((item['price'] * item['quantity'] for item in items), Decimal('0')),
+        'item_count': len(items),
+        'note': note[:255] or 'No additional notes provided.',
+    }
+
+    return (invoice, items), None
+
+
+# One transaction per batch: invoices (ids via RETURNING), their items and the users' invoices_count.
+def insert_batch(batch):
+    invoice_ids = db.session.scalars(
+        insert(Invoices).returning(Invoices.id, sort_by_parameter_order=True),
+        [invoice for invoice, _ in batch]
+    ).all()
+
+    db.session.execute(insert(InvoiceItem), [
+        dict(item, invoice_id=invoice_id)
+        for invoice_id, (_, items) in zip(invoice_ids, batch)
+        for item in items
+    ])
+
+    per_user = {}
+    for invoice, _ in batch:
+        per_user[invoice['user_id']] = per_user.get(invoice['user_id'], 0) + 1
+
+    db.session.execute(
+        update(User)
+        .where(User.id.in_(per_user))
+        .values(invoices_count=User.invoices_count + case(per_user, value=User.id, else_=0))
+    )
+
+    db.session.commit()
+
+
+def import_invoices(stream, fmt, batch_size=IMPORT_BATCH_SIZE):
+    report = ImportReport()
+    user_ids = set(db.session.scalars(select(User.id)))
+    records = READERS[fmt](stream)
+
+    while True:
+        chunk = list(islice(records, batch_size))
+        if not chunk:
+            break
+
+        batch, lines = [], []
+        for line, record in chunk:
+            parsed, error = validate_invoice(record, user_ids)
+
+            if error:
+                report.error(line, error)
+            else:
+                batch.append(parsed)
+                lines.append(line)
+
+        if not batch:
+            continue
+
+        try:
+            insert_batch(batch)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            for line in lines:
+                report.error(line, f'Batch rolled back: {e.__class__.__name__}')
+            continue
+
+        report.invoices += len(batch)
+        report.items += sum(len(items) for _, items in batch)
+
+    return report
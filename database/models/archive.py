@@ -0,0 +1,23 @@
+from database.db import db
+from database.models.invoices import InvoiceItem, Invoices
+from database.models.notification import Notification
+from database.models.events import Event
+
+
+# Same columns as `source` without its foreign keys (archived rows outlive nothing they point to, deleting a
+# user clears both), plus archived_at. SQLite may give a new row the id of an archived one, so the key is
+# (id, archived_at); an invoice and its items share the archived_at of the run that moved them.
+def _archive_table(source, index_column):
+    columns = [db.Column(column.name, column.type, nullable=column.nullable,
+                         primary_key=column.primary_key, autoincrement=False)
+               for column in source.columns]
+
+    return db.Table(f'{source.name}_archive', *columns,
+                    db.Column('archived_at', db.DateTime, primary_key=True),
+                    db.Index(f'ix_{source.name}_archive_{index_column}', index_column))
+
+
+invoices_archive = _archive_table(Invoices.__table__, 'user_id')
+invoice_item_archive = _archive_table(InvoiceItem.__table__, 'invoice_id')
+notification_archive = _archive_table(Notification.__table__, 'user_id')
+event_archive = _archive_table(Event.__table__, 'user_id')
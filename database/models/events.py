@@ -1,8 +1,33 @@
-from database.db import db
+from database.db import db, add_missing_columns
 from flask_login import UserMixin
 
+from sqlalchemy import update
+
 class Event(db.Model, UserMixin):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     start_date = db.Column(db.Date, nullable=False)
-    title = db.Column(db.String(100), nullable=False)
\ No newline at end of file
+    title = db.Column(db.String(100), nullable=False)
+    # Recurring events are one row: start_date is the first occurrence, rrule the normalised
+    # RRULE (see database.recurrence) and exdates comma separated ISO dates that are skipped.
+    rrule = db.Column(db.String(100))
+    exdates = db.Column(db.Text)
+    # Upper bound of the last occurrence, NULL when the series never ends.
+    last_date = db.Column(db.Date)
+
+
+# Databases created before recurring events existed get the columns, single events end on their start.
+def upgrade_event_recurrence():
+    added = add_missing_columns('event', {
+        'rrule': 'VARCHAR(100)',
+        'exdates': 'TEXT',
+        'last_date': 'DATE',
+    })
+
+    if 'last_date' not in added:
+        return False
+
+    db.session.execute(update(Event).where(Event.rrule.is_(None)).values(last_date=Event.start_date))
+    db.session.commit()
+
+    return True
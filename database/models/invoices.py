@@ -1,6 +1,9 @@
-from database.db import db
+from database.db import db, add_missing_columns
+from database.types import Money, to_money
 from flask_login import UserMixin
 
+from sqlalchemy import func, select, text, update
+
 
 class Invoices(db.Model, UserMixin):
     id = db.Column(db.Integer, primary_key=True)
@@ -13,17 +16,68 @@ class Invoices(db.Model, UserMixin):
     color = db.Column(db.String(50), nullable=False)
     from_address = db.Column(db.String(255), nullable=False)
     note = db.Column(db.String(255), nullable=True, default='No additional notes provided.')
-    
+    total = db.Column(Money, nullable=False, default=0)
+    item_count = db.Column(db.Integer, nullable=False, default=0)
+
+    # Keeps total/item_count in step with the items, listings never have to load them.
+    def add_item(self, name, price, quantity):
+        item = InvoiceItem(name=name, price=to_money(price), quantity=quantity)
+        self.items.append(item)
+
+        self.total = to_money(self.total or 0) + item.price * quantity
+        self.item_count = (self.item_count or 0) + 1
+
+        return item
+
     def __repr__(self):
         return f"<Invoice: {self.title}>"
 
 
 class InvoiceItem(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    invoice_id = db.Column(db.Integer, db.ForeignKey('invoices.id'), nullable=False)
+    # Indexed: deleting (or archiving) an invoice looks up its items, with foreign keys on that is a
+    # full scan of invoice_item per invoice otherwise.
+    invoice_id = db.Column(db.Integer, db.ForeignKey('invoices.id'), nullable=False, index=True)
     name = db.Column(db.String(255), nullable=False)
-    price = db.Column(db.Float, nullable=False)
+    price = db.Column(Money, nullable=False)
     quantity = db.Column(db.Integer, nullable=False)
 
     def __repr__(self):
-        return f"<Invoice item: {self.name}>"
\ No newline at end of file
+        return f"<Invoice item: {self.name}>"
+
+
+# Recomputes stored totals from the items in one UPDATE, for bulk item writes and backfills.
+def refresh_invoice_totals(invoice_ids=None):
+    item_total = select(func.coalesce(func.sum(InvoiceItem.price * InvoiceItem.quantity), 0)) \
+        .where(InvoiceItem.invoice_id == Invoices.id).scalar_subquery()
+    item_count = select(func.count(InvoiceItem.id)) \
+        .where(InvoiceItem.invoice_id == Invoices.id).scalar_subquery()
+
+    stmt = update(Invoices).values(total=item_total, item_count=item_count)
+
+    if invoice_ids is not None:
+        stmt = stmt.where(Invoices.id.in_(invoice_ids))
+
+    return db.session.execute(stmt).rowcount
+
+
+# Databases created before Invoices.total existed get the columns added and backfilled once.
+def upgrade_invoice_totals():
+    added = add_missing_columns('invoices', {
+        'total': 'NUMERIC(12, 2) NOT NULL DEFAULT 0',
+        'item_count': 'INTEGER NOT NULL DEFAULT 0',
+    })
+
+    if not added:
+        return False
+
+    refresh_invoice_totals()
+    db.session.commit()
+
+    return True
+
+
+# create_all doesn't add indexes to existing tables.
+def upgrade_invoice_item_index():
+    with db.engine.begin() as conn:
+        conn.execute(text('CREATE INDEX IF NOT EXISTS ix_invoice_item_invoice_id ON invoice_item (invoice_id)'))
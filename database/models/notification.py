@@ -1,8 +1,32 @@
-from database.db import db
+from database.db import db, add_missing_columns
 from flask_login import UserMixin
+from sqlalchemy import text, update
+
+from datetime import datetime, timezone
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
 
 class Notification(db.Model, UserMixin):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     title = db.Column(db.String(100), nullable=False)
-    redirect = db.Column(db.String(50), nullable=False)
\ No newline at end of file
+    redirect = db.Column(db.String(50), nullable=False)
+    # UTC, old notifications are moved to notification_archive (see database.archive).
+    created_at = db.Column(db.DateTime, index=True, default=_utcnow)
+
+
+# Databases created before notifications had a timestamp get the column, existing rows count as created now.
+def upgrade_notification_timestamps():
+    if not add_missing_columns('notification', {'created_at': 'TIMESTAMP'}):
+        return False
+
+    with db.engine.begin() as conn:
+        conn.execute(text('CREATE INDEX IF NOT EXISTS ix_notification_created_at ON notification (created_at)'))
+
+    db.session.execute(update(Notification).where(Notification.created_at.is_(None)).values(created_at=_utcnow()))
+    db.session.commit()
+
+    return True
@@ -7,6 +7,8 @@ class Roles(db.Model, UserMixin):
     color = db.Column(db.String(50), nullable=False)
     icon = db.Column(db.String(50), nullable=False)
     root = db.Column(db.Boolean, default=False)
+    # Comma separated permission names, see permissions.py.
+    permissions = db.Column(db.String(255), nullable=False, default='')
     
     def __repr__(self):
         return f"<Role: {self.name}>"
\ No newline at end of file
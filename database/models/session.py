@@ -0,0 +1,10 @@
+from database.db import db
+
+class UserSession(db.Model):
+    __tablename__ = 'user_session'
+
+    # sha256 of the cookie value, a leaked table doesn't leak usable session ids.
+    id = db.Column(db.String(64), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), index=True)
+    data = db.Column(db.Text, nullable=False)
+    expires = db.Column(db.DateTime, nullable=False, index=True)
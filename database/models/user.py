@@ -1,8 +1,12 @@
-from database.db import db
+from database.db import db, add_missing_columns
+from database.types import Money
 from flask_login import UserMixin
+from sqlalchemy import text, update
 
 from datetime import datetime
 
+import secrets
+
 class User(db.Model, UserMixin):
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(150), unique=True, nullable=False)
@@ -12,6 +16,55 @@ class User(db.Model, UserMixin):
     bio = db.Column(db.String(100), nullable=False, default='Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor incididunt ut labore et dolore magna aliqua. Ut enim ad minim veniam, quis nostrud exercitation ullamco laboris nisi ut aliquip ex ea commodo consequat')
     invoices_count = db.Column(db.Integer, nullable=False, default=0)
     todo_count = db.Column(db.Integer, nullable=False, default=0)
-    revenue = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(Money, nullable=False, default=0)
     profile_img = db.Column(db.String(50), nullable=False, default='images/default-profile.jpg')
-    joined = db.Column(db.String(10), nullable=False, default=datetime.now().strftime('%d.%m.%Y'))
\ No newline at end of file
+    joined = db.Column(db.String(10), nullable=False, default=datetime.now().strftime('%d.%m.%Y'))
+    # sha256 of the calendar feed token, the token itself is only shown once.
+    calendar_token = db.Column(db.String(64), unique=True, index=True)
+    # Bumped on every change that shows up in the .ics feeds, feed ETags and cached VEVENTs are keyed by it.
+    # Random start, like profile_version.
+    calendar_version = db.Column(db.Integer, nullable=False, default=lambda: secrets.randbelow(2 ** 31))
+    # Keys of the cached template fragments (see fragment_cache.py): bumped when anything shown on the
+    # user's card changes (name, email, role, bio, avatar), and when the user's notifications change.
+    # Starts at a random value, SQLite may hand a deleted user's id to a new one and fragments cached
+    # for the old row must not match.
+    profile_version = db.Column(db.Integer, nullable=False, default=lambda: secrets.randbelow(2 ** 31))
+    notification_version = db.Column(db.Integer, nullable=False, default=0)
+
+    # Atomic increment in the UPDATE, concurrent writers can't lose a bump.
+    def touch_calendar(self):
+        self.calendar_version = User.calendar_version + 1
+
+    def touch_profile(self):
+        self.profile_version = User.profile_version + 1
+
+
+# Notifications are often written without loading their users, one UPDATE for all of them.
+def touch_notifications(user_ids):
+    db.session.execute(
+        update(User)
+        .where(User.id.in_(set(user_ids)))
+        .values(notification_version=User.notification_version + 1)
+    )
+
+
+# Databases created before the calendar feeds existed get the columns once.
+def upgrade_calendar_feeds():
+    added = add_missing_columns('user', {
+        'calendar_token': 'VARCHAR(64)',
+        'calendar_version': 'INTEGER NOT NULL DEFAULT 0',
+    })
+
+    if 'calendar_token' in added:
+        with db.engine.begin() as conn:
+            conn.execute(text('CREATE UNIQUE INDEX IF NOT EXISTS ix_user_calendar_token ON "user" (calendar_token)'))
+
+    return bool(added)
+
+
+# Existing users start at version 0 for both, the first write moves them.
+def upgrade_fragment_versions():
+    return bool(add_missing_columns('user', {
+        'profile_version': 'INTEGER NOT NULL DEFAULT 0',
+        'notification_version': 'INTEGER NOT NULL DEFAULT 0',
+    }))
@@ -0,0 +1,151 @@
+import logging
+import re
+import time
+
+from collections import Counter
+
+# Flask related
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+from database.db import db
+
+logger = logging.getLogger('querylog')
+
+_PLACEHOLDER_LIST = re.compile(r'\((?:\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*,)+\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*\)')
+_NUMBER = re.compile(r'\b\d+\b')
+_WHITESPACE = re.compile(r'\s+')
+
+
+# Reduce a statement to its shape, so the same query with different ids or IN-list lengths compares equal.
+def statement_shape(statement):
+    shape = _WHITESPACE.sub(' ', statement).strip()
+    shape = _PLACEHOLDER_LIST.sub('(?)', shape)
+    return _NUMBER.sub('?', shape)
+
+
+def explain_query(conn, cursor, statement, parameters):
+    if not statement.lstrip().upper().startswith('SELECT'):
+        return []
+
+    prefix = 'EXPLAIN QUERY PLAN ' if conn.dialect.name == 'sqlite' else 'EXPLAIN '
+
+    # Fresh DBAPI cursor, the original one may still hold unread rows.
+    plan_cursor = cursor.connection.cursor()
+    try:
+        plan_cursor.execute(prefix + statement, parameters)
+        return [' '.join(str(col) for col in row) for row in plan_cursor.fetchall()]
+    except Exception as e:
+        return [f'EXPLAIN failed: {e}']
+    finally:
+        plan_cursor.close()
+
+
+# Counts statements for as long as the block runs, e.g. to check a route's query budget.
+class QueryCounter:
+    def __init__(self, app):
+        self.app = app
+        self.statements = []
+        self.engines = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def shapes(self):
+        return Counter(statement_shape(statement) for statement in self.statements)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        with self.app.app_context():
+            self.engines = list(db.engines.values())
+
+        for engine in self.engines:
+            event.listen(engine, 'after_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, *exc):
+        for engine in self.engines:
+            event.remove(engine, 'after_cursor_execute', self._record)
+        return False
+
+
+def assert_query_budget(client, url, max_queries, method='GET', **kwargs):
+    with QueryCounter(client.application) as counter:
+        response = client.open(url, method=method, **kwargs)
+
+    if counter.count > max_queries:
+        details = '\n'.join(f'  {count}x {shape}' for shape, count in counter.shapes().most_common())
+        raise AssertionError(f'{method} {url} issued {counter.count} queries, budget is {max_queries}:\n{details}')
+
+    return response
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('querylog_started', []).append(time.perf_counter())
+
+
+# A failed statement never reaches after_cursor_execute, drop its start time so pooled connections
+# don't collect stale entries.
+def _handle_error(context):
+    if context.connection is None or context.statement is None:
+        return
+
+    started = context.connection.info.get('querylog_started')
+    if started:
+        started.pop()
+
+
+def _make_after_cursor_execute(slow_seconds):
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get('querylog_started')
+        if not started:
+            return
+
+        duration = time.perf_counter() - started.pop()
+
+        if has_request_context() and '_query_shapes' in g:
+            g._query_shapes[statement_shape(statement)] += 1
+
+        if duration >= slow_seconds:
+            plan = [] if executemany else explain_query(conn, cursor, statement, parameters)
+            logger.warning('Slow query (%.1f ms): %s\n  params: %r\n  plan:\n    %s',
+                           duration * 1000, statement, parameters, '\n    '.join(plan) or '-')
+
+    return after_cursor_execute
+
+
+# Development/staging only: logs slow statements and flags requests repeating the same statement shape.
+def init_query_log(app):
+    if not app.config.get('QUERY_LOG_ENABLED', False):
+        return
+
+    slow_seconds = app.config.get('SLOW_QUERY_SECONDS', 0.1)
+    repeat_threshold = app.config.get('N_PLUS_ONE_THRESHOLD', 10)
+
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', _make_after_cursor_execute(slow_seconds))
+            event.listen(engine, 'handle_error', _handle_error)
+
+    @app.before_request
+    def start_query_log():
+        g._query_shapes = Counter()
+
+    @app.after_request
+    def check_query_repeats(response):
+        shapes = g.pop('_query_shapes', None)
+
+        if shapes is None:
+            return response
+
+        for shape, count in shapes.items():
+            if count > repeat_threshold:
+                logger.warning('Possible N+1 in %s %s: %d x %s',
+                               request.method, request.endpoint, count, shape)
+
+        response.headers['X-Query-Count'] = str(sum(shapes.values()))
+        return response
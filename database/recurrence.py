@@ -0,0 +1,153 @@
+from datetime import date, timedelta
+from functools import lru_cache
+
+FREQUENCIES = ('DAILY', 'WEEKLY', 'MONTHLY')
+RULE_PARTS = ('FREQ', 'INTERVAL', 'COUNT', 'UNTIL')
+MAX_COUNT = 5000
+
+# Expansions are keyed by the whole series (start, rule, exceptions) plus the range, so edits never need
+# invalidating; FullCalendar asks for the same month ranges over and over.
+EXPANSION_CACHE_SIZE = 4096
+
+
+def _parse_date(value):
+    # Accepts DATE (20260131) and DATE-TIME (20260131T000000Z) forms, only the date is used.
+    return date(int(value[:4]), int(value[4:6]), int(value[6:8]))
+
+
+# Subset of RFC 5545 RRULE: FREQ=DAILY|WEEKLY|MONTHLY with INTERVAL and either COUNT or UNTIL.
+# Returns (freq, interval, count, until) and raises ValueError for anything else.
+def parse_rrule(rule):
+    parts = {}
+
+    for part in rule.strip().upper().removeprefix('RRULE:').split(';'):
+        if not part:
+            continue
+
+        key, sep, value = part.partition('=')
+        if not sep or key not in RULE_PARTS or key in parts:
+            raise ValueError(f'Unsupported RRULE part {part!r}')
+
+        parts[key] = value
+
+    freq = parts.get('FREQ')
+    if freq not in FREQUENCIES:
+        raise ValueError('FREQ must be DAILY, WEEKLY or MONTHLY')
+
+    interval = int(parts.get('INTERVAL', 1))
+    count = int(parts['COUNT']) if 'COUNT' in parts else None
+    until = _parse_date(parts['UNTIL']) if 'UNTIL' in parts else None
+
+    if interval < 1:
+        raise ValueError('INTERVAL must be positive')
+    if count is not None and not 1 <= count <= MAX_COUNT:
+        raise ValueError(f'COUNT must be between 1 and {MAX_COUNT}')
+    if count is not None and until is not None:
+        raise ValueError('COUNT and UNTIL are mutually exclusive')
+
+    return freq, interval, count, until
+
+
+def format_rrule(freq, interval=1, count=None, until=None):
+    parts = [f'FREQ={freq}']
+
+    if interval != 1:
+        parts.append(f'INTERVAL={interval}')
+    if count is not None:
+        parts.append(f'COUNT={count}')
+    if until is not None:
+        parts.append(f'UNTIL={until:%Y%m%d}')
+
+    return ';'.join(parts)
+
+
+# Normalised form that gets stored, equal rules always produce equal strings (and share cache entries).
+def normalize_rrule(rule):
+    return format_rrule(*parse_rrule(rule))
+
+
+def parse_exdates(value):
+    return frozenset(date.fromisoformat(day) for day in value.split(',')) if value else frozenset()
+
+
+def format_exdates(days):
+    return ','.join(sorted(day.isoformat() for day in days)) or None
+
+
+def _months_between(start, day):
+    return (day.year - start.year) * 12 + day.month - start.month
+
+
+# Candidate dates in order, starting at the first one on or after `since`. Only whole periods are
+# skipped, so monthly rules still see every month from there on (the 31st is skipped in shorter months).
+def _candidates(start, freq, interval, since):
+    if freq == 'MONTHLY':
+        index = max(0, _months_between(start, since) // interval)
+
+        while True:
+            month = start.month - 1 + index * interval
+            year = start.year + month // 12
+
+            if year > 9999:
+                return
+
+            try:
+                yield date(year, month % 12 + 1, start.day)
+            except ValueError:
+                pass
+
+            index += 1
+
+    step = timedelta(days=interval * (7 if freq == 'WEEKLY' else 1))
+    index = max(0, -(-(since - start).days // step.days))
+    day = start + index * step
+
+    while day <= date.max - step:
+        yield day
+        day += step
+
+
+@lru_cache(maxsize=EXPANSION_CACHE_SIZE)
+def _expand(start, rule, exdates, range_start, range_end):
+    freq, interval, count, until = parse_rrule(rule)
+    excluded = parse_exdates(exdates)
+    last = range_end if until is None else min(range_end, until)
+
+    # COUNT numbers occurrences from the series start (exceptions included, as in RFC 5545),
+    # so those series are walked from the beginning; they are at most MAX_COUNT long.
+    since = start if count is not None else max(start, range_start)
+    occurrences = []
+
+    for number, day in enumerate(_candidates(start, freq, interval, since)):
+        if day > last or (count is not None and number >= count):
+            break
+
+        if day >= range_start and day not in excluded:
+            occurrences.append(day)
+
+    return tuple(occurrences)
+
+
+# Occurrence dates of one Event row within [range_start, range_end].
+def occurrences(start, rule, exdates, range_start, range_end):
+    if not rule:
+        return (start,) if range_start <= start <= range_end else ()
+
+    return _expand(start, rule, exdates, range_start, range_end)
+
+
+# Upper bound for the last occurrence, used to filter series by range in SQL; None when it never ends.
+def last_occurrence(start, rule):
+    if not rule:
+        return start
+
+    freq, interval, count, until = parse_rrule(rule)
+
+    if until is not None:
+        return until
+    if count is not None:
+        for number, day in enumerate(_candidates(start, freq, interval, start), start=1):
+            if number == count:
+                return day
+
+    return None
@@ -0,0 +1,66 @@
+import time
+
+# Flask related
+from flask import current_app, g, has_request_context, request, session as cookie_session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+REPLICA_BIND = 'replica'
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+# Keeps a GET view on the primary, for reads that must see the latest writes of other users too.
+def use_primary(view):
+    view.use_primary = True
+    return view
+
+
+# Statements run on the replica bind while the request was routed there (see init_replica_routing);
+# flushes and INSERT/UPDATE/DELETE always go to the primary.
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None
+                and not self._flushing
+                and not getattr(clause, 'is_dml', False)
+                and has_request_context()
+                and g.get('read_replica')):
+            return self._db.engines[REPLICA_BIND]
+
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _flushed(session, flush_context):
+    if has_request_context():
+        g.db_wrote = True
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _executed(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        if has_request_context():
+            g.db_wrote = True
+
+
+# GET/HEAD requests read from the replica, unless the same browser session wrote something within
+# the last REPLICA_LAG_SECONDS, so users always see their own changes.
+def init_replica_routing(app):
+    if REPLICA_BIND not in app.config.get('SQLALCHEMY_BINDS', {}):
+        return
+
+    lag = app.config.get('REPLICA_LAG_SECONDS', 2.0)
+
+    @app.before_request
+    def choose_bind():
+        view = current_app.view_functions.get(request.endpoint)
+
+        g.read_replica = (request.method in READ_METHODS
+                          and not getattr(view, 'use_primary', False)
+                          and time.time() - cookie_session.get('db_write_at', 0) > lag)
+
+    @app.after_request
+    def remember_write(response):
+        if g.get('db_wrote'):
+            cookie_session['db_write_at'] = time.time()
+
+        return response
@@ -0,0 +1,29 @@
+from decimal import Decimal, ROUND_HALF_UP
+
+from database.db import db
+
+CENT = Decimal('0.01')
+
+
+# Money is always a Decimal rounded to cents, never a float.
+def to_money(value):
+    if value is None:
+        return None
+
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value))
+
+    return value.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+# NUMERIC(12, 2) column that reads and writes Decimal. asdecimal=False on the impl keeps SQLite
+# from warning about missing native Decimal support, the conversion happens here instead.
+class Money(db.TypeDecorator):
+    impl = db.Numeric(12, 2, asdecimal=False)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return to_money(value)
+
+    def process_result_value(self, value, dialect):
+        return to_money(value)
@@ -0,0 +1,76 @@
+import threading
+
+from collections import OrderedDict
+
+from jinja2 import nodes
+from jinja2.ext import Extension
+
+FRAGMENT_CACHE_SIZE = 4096
+
+
+# Bounded, thread-safe LRU of rendered fragments. Every worker process has its own.
+class LRUCache:
+    def __init__(self, maxsize=FRAGMENT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+# {% cache 'name', part, ... %}...{% endcache %} renders the body once per key and then serves it from
+# environment.fragment_cache. Keys must hold every value the body depends on, usually entity versions
+# (User.profile_version, User.notification_version), so a write makes a new key instead of having to
+# find the old entries; these drop out of the LRU on their own.
+class FragmentCacheExtension(Extension):
+    tags = {'cache'}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=None)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+
+        parts = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            parts.append(parser.parse_expression())
+
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+
+        return nodes.CallBlock(self.call_method('_render', [nodes.Tuple(parts, 'load')]),
+                               [], [], body).set_lineno(lineno)
+
+    def _render(self, key, caller):
+        cache = self.environment.fragment_cache
+
+        if cache is None:
+            return caller()
+
+        value = cache.get(key)
+        if value is None:
+            value = caller()
+            cache.set(key, value)
+
+        return value
+
+
+# FRAGMENT_CACHE_ENABLED = False renders every fragment (e.g. while editing templates, cached
+# fragments outlive template reloads).
+def init_fragment_cache(app):
+    app.jinja_env.add_extension(FragmentCacheExtension)
+
+    if app.config.get('FRAGMENT_CACHE_ENABLED', True):
+        app.jinja_env.fragment_cache = LRUCache(app.config.get('FRAGMENT_CACHE_SIZE', FRAGMENT_CACHE_SIZE))
@@ -0,0 +1,48 @@
+import multiprocessing
+import os
+import subprocess
+import sys
+
+# Production serving profile: `gunicorn` picks this file up from the working directory.
+wsgi_app = 'wsgi:app'
+bind = os.environ.get('BIND', '0.0.0.0:5050')
+
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers now and then so a slow leak can't grow forever.
+max_requests = 1000
+max_requests_jitter = 100
+
+# Preloading builds the app once in the master and forks it (faster boot, shared memory pages),
+# PRELOAD_APP=0 switches to lazy loading in every worker (needed for per-worker code reloads).
+preload_app = os.environ.get('PRELOAD_APP', '1') == '1'
+
+
+def post_fork(server, worker):
+    if not preload_app:
+        return
+
+    from wsgi import app
+    from database.db import dispose_engines
+
+    dispose_engines(app)
+
+
+# Without preloading, every worker would import wsgi and run the schema upgrades itself. The master runs
+# them once per start or reload (HUP), in a separate process so it never imports the app and workers
+# still load fresh code, then tells the workers to skip them.
+def upgrade_schema(server):
+    if preload_app:
+        return
+
+    subprocess.run([sys.executable, '-m', 'flask', '--app', 'main', 'upgrade-db'], check=True)
+    os.environ['SCHEMA_UPGRADED'] = '1'
+
+
+on_starting = upgrade_schema
+on_reload = upgrade_schema
@@ -0,0 +1,10 @@
+SECRET_KEY = 'dev'
+UPLOAD_FOLDER = 'app/static/images'
+ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg'}
+METRICS_ENABLED = False
+PROFILE_SAMPLE_RATE = 1.0
+PROFILE_SLOW_SECONDS = 0.0
+PROFILE_DIR = '/tmp/profiles'
+QUERY_LOG_ENABLED = False
+SLOW_QUERY_SECONDS = 0.0
+N_PLUS_ONE_THRESHOLD = 3
@@ -0,0 +1,255 @@
+import hmac
+import os
+import random
+import time
+
+from bisect import bisect_left
+from threading import Lock
+
+# Flask related
+from flask import Blueprint, Response, g, has_request_context, request
+from flask import before_render_template, template_rendered
+from flask import current_app
+from flask_login import current_user
+from sqlalchemy import event
+
+from database.db import db
+from permissions import has_permission, MANAGE_SYSTEM
+from utils import LazyModule
+
+cProfile = LazyModule('cProfile')
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 250)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+metrics_bp = Blueprint('metrics', __name__)
+
+
+class Histogram:
+    def __init__(self, name, description, buckets):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self.series = {}
+
+    def observe(self, endpoint, value):
+        counts, total = self.series.get(endpoint, (None, 0.0))
+
+        if counts is None:
+            counts = [0] * (len(self.buckets) + 1)
+
+        counts[bisect_left(self.buckets, value)] += 1
+        self.series[endpoint] = (counts, total + value)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.description}',
+                 f'# TYPE {self.name} histogram']
+
+        for endpoint, (counts, total) in sorted(self.series.items()):
+            cumulative = 0
+
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{endpoint="{endpoint}",le="{bound}"}} {cumulative}')
+
+            cumulative += counts[-1]
+            lines.append(f'{self.name}_bucket{{endpoint="{endpoint}",le="+Inf"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{endpoint="{endpoint}"}} {total}')
+            lines.append(f'{self.name}_count{{endpoint="{endpoint}"}} {cumulative}')
+
+        return lines
+
+
+class Counter:
+    def __init__(self, name, description):
+        self.name = name
+        self.description = description
+        self.series = {}
+
+    def inc(self, endpoint, value=1):
+        self.series[endpoint] = self.series.get(endpoint, 0) + value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.description}',
+                 f'# TYPE {self.name} counter']
+
+        for endpoint, value in sorted(self.series.items()):
+            lines.append(f'{self.name}{{endpoint="{endpoint}"}} {value}')
+
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.lock = Lock()
+        self.latency = Histogram('http_request_duration_seconds',
+                                 'Request latency per endpoint.', LATENCY_BUCKETS)
+        self.response_size = Histogram('http_response_size_bytes',
+                                       'Response body size per endpoint.', SIZE_BUCKETS)
+        self.sql_queries = Histogram('sql_queries_per_request',
+                                     'SQL statements issued per request.', QUERY_COUNT_BUCKETS)
+        self.sql_seconds = Counter('sql_query_seconds_total',
+                                   'Time spent executing SQL statements.')
+        self.template_seconds = Counter('template_render_seconds_total',
+                                        'Time spent rendering templates.')
+        self.requests = Counter('http_requests_total', 'Requests handled per endpoint.')
+
+    def record(self, endpoint, stats, duration, size):
+        with self.lock:
+            self.requests.inc(endpoint)
+            self.latency.observe(endpoint, duration)
+            self.sql_queries.observe(endpoint, stats['sql_count'])
+            self.sql_seconds.inc(endpoint, stats['sql_time'])
+            self.template_seconds.inc(endpoint, stats['template_time'])
+
+            if size is not None:
+                self.response_size.observe(endpoint, size)
+
+    def render(self):
+        with self.lock:
+            lines = []
+
+            for metric in (self.requests, self.latency, self.sql_queries,
+                           self.sql_seconds, self.template_seconds, self.response_size):
+                lines.extend(metric.render())
+
+        return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry()
+
+
+def _has_metrics_token():
+    token = current_app.config.get('METRICS_TOKEN')
+    scheme, _, sent = request.headers.get('Authorization', '').partition(' ')
+
+    return bool(token) and scheme.lower() == 'bearer' and hmac.compare_digest(sent.encode(), token.encode())
+
+
+# Scrapers send `Authorization: Bearer <METRICS_TOKEN>`, signed in users need MANAGE_SYSTEM.
+@metrics_bp.route('/metrics')
+def export_metrics():
+    if _has_metrics_token() or has_permission(MANAGE_SYSTEM):
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+    if current_user.is_authenticated:
+        return Response('Forbidden\n', status=403, mimetype='text/plain')
+
+    return Response('Unauthorized\n', status=401, mimetype='text/plain',
+                    headers={'WWW-Authenticate': 'Bearer realm="metrics"'})
+
+
+# Per-request counters live on `g`, outside a request there is nothing to record.
+def _request_stats():
+    if not has_request_context():
+        return None
+    return g.get('_metrics')
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _request_stats()
+
+    if stats is not None:
+        stats['sql_started'] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _request_stats()
+
+    if stats is not None and stats['sql_started'] is not None:
+        stats['sql_count'] += 1
+        stats['sql_time'] += time.perf_counter() - stats['sql_started']
+        stats['sql_started'] = None
+
+
+def _before_render(sender, template, context, **extra):
+    stats = _request_stats()
+
+    if stats is not None:
+        stats['render_started'].append(time.perf_counter())
+
+
+def _after_render(sender, template, context, **extra):
+    stats = _request_stats()
+
+    if stats is not None and stats['render_started']:
+        started = stats['render_started'].pop()
+
+        # Nested renders (e.g. includes through render_template) are counted once.
+        if not stats['render_started']:
+            stats['template_time'] += time.perf_counter() - started
+
+
+def _dump_profile(app, profiler, endpoint):
+    profile_dir = app.config.get('PROFILE_DIR', 'profiles')
+    os.makedirs(profile_dir, exist_ok=True)
+
+    filename = f"{endpoint}-{int(time.time() * 1000)}.prof"
+    profiler.dump_stats(os.path.join(profile_dir, filename))
+
+
+# Metrics are opt-in: when METRICS_ENABLED is off no hooks are installed at all.
+def init_metrics(app):
+    if not app.config.get('METRICS_ENABLED', False):
+        return
+
+    sample_rate = app.config.get('PROFILE_SAMPLE_RATE', 0.0)
+    slow_seconds = app.config.get('PROFILE_SLOW_SECONDS', 1.0)
+
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_after_render, app)
+
+    @app.before_request
+    def start_request_metrics():
+        g._metrics = {
+            'started': time.perf_counter(),
+            'sql_count': 0,
+            'sql_time': 0.0,
+            'sql_started': None,
+            'template_time': 0.0,
+            'render_started': [],
+            'profiler': None,
+        }
+
+        if sample_rate and random.random() < sample_rate:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            g._metrics['profiler'] = profiler
+
+    @app.after_request
+    def record_request_metrics(response):
+        stats = g.pop('_metrics', None)
+
+        if stats is None:
+            return response
+
+        duration = time.perf_counter() - stats['started']
+        endpoint = request.endpoint or 'unmatched'
+        size = None if response.is_streamed else response.calculate_content_length()
+
+        metrics.record(endpoint, stats, duration, size)
+
+        profiler = stats['profiler']
+        if profiler is not None:
+            profiler.disable()
+
+            if duration >= slow_seconds:
+                _dump_profile(app, profiler, endpoint)
+
+        return response
+
+    # after_request is skipped when a view raises, make sure sampling stops anyway.
+    @app.teardown_request
+    def stop_request_profiler(error=None):
+        stats = g.pop('_metrics', None)
+
+        if stats is not None and stats['profiler'] is not None:
+            stats['profiler'].disable()
+
+    app.register_blueprint(metrics_bp)
@@ -0,0 +1,120 @@
+import threading
+import time
+
+from functools import wraps
+
+# Flask related
+from flask import current_app, g, request, redirect, url_for, jsonify
+from flask_login import current_user
+
+from database.db import db, add_missing_columns
+from database.models.roles import Roles
+
+from sqlalchemy import select, update
+
+ADMIN_PANEL = 'admin_panel'          # open /admin
+VIEW_ALL = 'view_all'                # see and export everyone's invoices
+MANAGE_INVOICES = 'manage_invoices'  # notes, statuses, imports
+MANAGE_USERS = 'manage_users'
+MANAGE_ROLES = 'manage_roles'
+MANAGE_SYSTEM = 'manage_system'      # backups
+
+PERMISSIONS = (ADMIN_PANEL, VIEW_ALL, MANAGE_INVOICES, MANAGE_USERS, MANAGE_ROLES, MANAGE_SYSTEM)
+
+# Seeded into Roles.permissions for the built-in roles, new roles start without any.
+DEFAULT_ROLE_PERMISSIONS = {
+    'admin': PERMISSIONS,
+    'founder': (ADMIN_PANEL, VIEW_ALL),
+    'user': (),
+}
+
+# Other workers pick up role changes after this many seconds.
+PERMISSIONS_TTL = 60
+
+_role_permissions = None
+_loaded_at = 0.0
+_lock = threading.Lock()
+
+
+def parse_permissions(value):
+    return frozenset(name for name in (value or '').split(',') if name)
+
+
+def format_permissions(names):
+    return ','.join(name for name in PERMISSIONS if name in names)
+
+
+# role name -> frozenset of permissions, read from Roles once and then shared by every request.
+def role_permissions():
+    global _role_permissions, _loaded_at
+
+    ttl = current_app.config.get('PERMISSIONS_TTL', PERMISSIONS_TTL)
+
+    if _role_permissions is None or time.monotonic() - _loaded_at > ttl:
+        rows = db.session.execute(select(Roles.name, Roles.permissions))
+
+        with _lock:
+            _role_permissions = {name: parse_permissions(value) for name, value in rows}
+            _loaded_at = time.monotonic()
+
+    return _role_permissions
+
+
+# Call after changing Roles, the next check reloads the map.
+def invalidate_permissions():
+    global _role_permissions
+
+    with _lock:
+        _role_permissions = None
+
+
+# Looked up once per request, later checks in the same request are a set lookup.
+def current_permissions():
+    if 'permissions' not in g:
+        if current_user.is_authenticated:
+            g.permissions = role_permissions().get(current_user.role, frozenset())
+        else:
+            g.permissions = frozenset()
+
+    return g.permissions
+
+
+def has_permission(name):
+    return name in current_permissions()
+
+
+# Anonymous users go to the login page. Without the permission, page requests are redirected to the team
+# page and everything else gets a 403.
+def permission_required(*names):
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            if not current_user.is_authenticated:
+                return current_app.login_manager.unauthorized()
+
+            if not current_permissions().issuperset(names):
+                if request.method == 'GET':
+                    return redirect(url_for('team.team'))
+                return jsonify({'status': 'error', 'message': 'Forbidden'}), 403
+
+            return f(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Databases created before Roles.permissions existed get the column and the built-in roles their defaults.
+def upgrade_role_permissions():
+    if not add_missing_columns('roles', {'permissions': "VARCHAR(255) NOT NULL DEFAULT ''"}):
+        return False
+
+    for name, names in DEFAULT_ROLE_PERMISSIONS.items():
+        db.session.execute(update(Roles).where(Roles.name == name).values(permissions=format_permissions(names)))
+
+    db.session.commit()
+    return True
+
+
+def init_permissions(app):
+    @app.context_processor
+    def inject_permissions():
+        return {'can': has_permission}
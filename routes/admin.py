@@ -0,0 +1,507 @@
+from flask import Blueprint, render_template, url_for, request, redirect, jsonify, current_app
+from flask_login import current_user
+
+from database.db import db
+from database.models.user import User, touch_notifications
+from database.models.roles import Roles
+from database.models.invoices import InvoiceItem, Invoices
+from database.models.notification import Notification
+from database.models.events import Event
+from database.models.availability import Availability
+from database.models.todo import Todo
+from database.backup import backup_database, verify_backup, restore_backup, sync_replica, BACKUP_KEEP
+from database.archive import (archive_old_rows, delete_user_archives, ARCHIVE_BATCH_SIZE,
+                              ARCHIVE_INVOICE_DAYS, ARCHIVE_NOTIFICATION_DAYS, ARCHIVE_EVENT_DAYS)
+from database.routing import REPLICA_BIND
+from database.models.session import UserSession
+
+from permissions import (permission_required, invalidate_permissions, format_permissions, parse_permissions,
+                         PERMISSIONS, ADMIN_PANEL, MANAGE_INVOICES, MANAGE_USERS, MANAGE_ROLES, MANAGE_SYSTEM)
+from session_store import revoke_user_sessions
+from routes.feeds import forget_user as forget_feed_user
+
+from sqlalchemy import case, delete, func, insert, select, update
+
+from utils import hash_password, generate_random_color, generate_random_icon, LazyModule
+
+import click
+import json
+import os
+
+
+# random_username reads its word lists on import, only pay for it when a user is created.
+random_username = LazyModule('random_username.generate')
+
+admin_bp = Blueprint('admin', __name__)
+
+
+@admin_bp.route('/admin')
+@permission_required(ADMIN_PANEL)
+def admin():
+
+    roles = Roles.query.all()
+    # Roles has no version column, the few rows are loaded anyway and key the role list fragments themselves.
+    roles_version = hash(tuple((role.id, role.name, role.color, role.icon, role.root, role.permissions) for role in roles))
+    # Only the columns the invoice cards show. The whole list is one cached fragment keyed by these rows,
+    # a fragment per invoice would fill the LRU and push out everything else on big tables.
+    invoices = db.session.execute(
+        select(Invoices.id, Invoices.status, Invoices.note, Invoices.title, Invoices.total,
+               Invoices.color, Invoices.from_address, Invoices.date_created)
+    ).all()
+    invoices_version = hash(tuple(invoices))
+
+    admins = User.query.filter(User.role.in_(['admin', 'founder'])).all()
+    managers = User.query.filter_by(role='manager').all()
+    others = User.query.filter(~User.role.in_(['admin', 'manager', 'founder'])).all()
+
+    team_count = User.query.count()
+    roles_count = Roles.query.count()
+
+    invoices_total = db.session.query(func.sum(User.invoices_count)).scalar() or 0
+    todos_total = db.session.query(func.sum(User.todo_count)).scalar() or 0
+
+    return render_template('admin_panel.html',
+                           active_page='admin',
+                           roles=roles,
+                           roles_version=roles_version,
+                           permissions=PERMISSIONS,
+                           parse_permissions=parse_permissions,
+                           admins=admins,
+                           managers=managers,
+                           others=others,
+                           team_count=team_count,
+                           roles_count=roles_count,
+                           invoices_total=invoices_total,
+                           todos_total=todos_total,
+                           invoices=invoices,
+                           invoices_version=invoices_version)
+
+
+@admin_bp.route('/set-note', methods=['POST'])
+@permission_required(MANAGE_INVOICES)
+def set_note():
+    invoice_id = request.form.get('invoice_id')
+    note = request.form.get('note')
+
+    if not invoice_id or not note:
+        return redirect(url_for('admin.admin'))
+    invoice = Invoices.query.get(invoice_id)
+    invoice.note = note
+
+    notification = Notification(user_id=current_user.id,
+                                title=f'"{invoice.title[:10]}.." invoice note updated.',
+                                redirect=f'/invoices')
+
+    db.session.add(notification)
+    touch_notifications([current_user.id])
+    db.session.commit()
+
+    return redirect(url_for('admin.admin'))
+
+
+@admin_bp.route('/invoices/update_status', methods=['POST'])
+@permission_required(MANAGE_INVOICES)
+def update_inovoice_status():
+    invoice_id = request.args.get('invoice_id')
+    status = request.args.get('status')
+
+    if not invoice_id or not status:
+        return jsonify({'status': 'error', 'message': 'Missing parameters'}), 400
+
+    invoice = Invoices.query.get(invoice_id)
+
+    if not invoice:
+        return jsonify({'status': 'error', 'message': 'Invoice not found'}), 404
+
+    invoice.status = status
+
+    if status == 'paid':
+        user = User.query.get(invoice.user_id)
+        user.revenue += invoice.total
+
+    db.session.commit()
+
+    notification = Notification(user_id=invoice.user_id,
+                            title=f'{invoice.title[:10]}.. invoice status updated.',
+                            redirect=f'/invoices')
+
+    db.session.add(notification)
+    touch_notifications([invoice.user_id])
+    db.session.commit()
+
+    return jsonify({'status': 'success'})
+
+
+INVOICE_STATUSES = ['requested', 'paid', 'declined']
+BULK_STATUS_LIMIT = 5000
+
+
+# Same as update_inovoice_status for many invoices: one transaction, set-based UPDATE/INSERT statements.
+# The UPDATE only matches invoices not already in the target status and returns those rows, revenue and
+# notifications are built from them. A concurrent request for the same invoices waits for the row locks
+# and then no longer matches them, so an invoice is never counted as paid twice.
+@admin_bp.route('/invoices/update_status/bulk', methods=['POST'])
+@permission_required(MANAGE_INVOICES)
+def bulk_update_invoice_status():
+    data = request.get_json(silent=True)
+
+    if not isinstance(data, dict):
+        return jsonify({'status': 'error', 'message': 'Expected a JSON object'}), 400
+
+    status = data.get('status')
+    invoice_ids = data.get('invoice_ids') or []
+
+    if status not in INVOICE_STATUSES or not isinstance(invoice_ids, list) or not invoice_ids:
+        return jsonify({'status': 'error', 'message': 'Missing parameters'}), 400
+
+    if len(invoice_ids) > BULK_STATUS_LIMIT:
+        return jsonify({'status': 'error', 'message': f'At most {BULK_STATUS_LIMIT} invoices per request'}), 400
+
+    try:
+        invoice_ids = list(dict.fromkeys(int(invoice_id) for invoice_id in invoice_ids))
+    except (TypeError, ValueError):
+        return jsonify({'status': 'error', 'message': 'Invalid invoice id'}), 400
+
+    changed = db.session.execute(
+        update(Invoices)
+        .where(Invoices.id.in_(invoice_ids), Invoices.status != status)
+        .values(status=status)
+        .returning(Invoices.id, Invoices.user_id, Invoices.title, Invoices.total),
+        execution_options={'synchronize_session': False}
+    ).all()
+
+    if changed:
+        if status == 'paid':
+            paid = {}
+            for row in changed:
+                paid[row.user_id] = paid.get(row.user_id, 0) + row.total
+
+            db.session.execute(
+                update(User)
+                .where(User.id.in_(paid))
+                .values(revenue=User.revenue + case(paid, value=User.id, else_=0))
+            )
+
+        db.session.execute(insert(Notification), [
+            {'user_id': row.user_id,
+             'title': f'{row.title[:10]}.. invoice status updated.',
+             'redirect': '/invoices'}
+            for row in changed
+        ])
+        touch_notifications(row.user_id for row in changed)
+
+    found = set(db.session.scalars(select(Invoices.id).where(Invoices.id.in_(invoice_ids))))
+    db.session.commit()
+
+    updated = {row.id for row in changed}
+    results = {}
+    for invoice_id in invoice_ids:
+        if invoice_id in updated:
+            results[invoice_id] = 'updated'
+        elif invoice_id in found:
+            results[invoice_id] = 'unchanged'
+        else:
+            results[invoice_id] = 'not_found'
+
+    return jsonify({'status': 'success', 'results': results})
+
+
+@admin_bp.route('/user-add', methods=['POST'])
+@permission_required(MANAGE_USERS)
+def user_add():
+    if request.method == "POST":
+        try:
+            email = request.form.get('email')
+            password = request.form.get('password').strip()
+            role = request.form.get('role')
+
+            if not email or not password or not role:
+                return jsonify({'success': False, 'error': 'Invalid data provided.'}), 400
+
+            if User.query.filter_by(email=email).first():
+                return jsonify({'success': False, 'error': 'User already exists.'}), 400
+
+            hashed_password = hash_password(password)
+            name = random_username.generate_username()[0][:20]
+            new_user = User(email=email,
+                            password=hashed_password,
+                            role=role,
+                            name=name,
+                            )
+
+            db.session.add(new_user)
+            db.session.commit()
+
+            notification = Notification(user_id=new_user.id,
+                                        title=f'Welcome to the team, {name}! Check out profile.',
+                                        redirect=f'/profile')
+            db.session.add(notification)
+            touch_notifications([new_user.id])
+            db.session.commit()
+
+
+            return jsonify({'success': True, 'message': 'User created successfully.'}), 201
+        except Exception as e:
+            print(f"Server error: {e}")
+            return jsonify({'success': False, 'error': 'Internal Error'}), 500
+
+    return jsonify({'success': False, 'error': 'Invalid request method.'}), 405
+
+@admin_bp.route('/edit-user', methods=['POST'])
+@permission_required(MANAGE_USERS)
+def edit_user():
+    if request.method == "POST":
+        try:
+            email = request.form.get('email')
+            new_password = request.form.get('new_password', '').strip()
+            name = request.form.get('name')
+            role = request.form.get('role')
+            user_id = request.form.get('user_id')
+            action = request.form.get('action')
+
+            if not email or not name or not role or not user_id:
+                return jsonify({'success': False, 'error': 'Invalid data provided.'}), 400
+
+            user = User.query.get(int(user_id))
+
+            if not user:
+                return jsonify({'success': False, 'error': 'User not found.'}), 404
+
+            if action == 'delete':
+                if user.id == current_user.id:
+                    return jsonify({'success': False, 'error': 'Cannot delete yourself'}), 400
+
+                # Rows referencing the user go first, foreign keys are enforced (see database.db).
+                user_invoices = select(Invoices.id).where(Invoices.user_id == user.id)
+                db.session.execute(delete(InvoiceItem).where(InvoiceItem.invoice_id.in_(user_invoices)))
+
+                for model in (Invoices, Event, Availability, Notification):
+                    db.session.execute(delete(model).where(model.user_id == user.id))
+
+                db.session.execute(delete(Todo).where(Todo.user_id == str(user.id)))
+                db.session.execute(delete(UserSession).where(UserSession.user_id == user.id))
+                delete_user_archives(user.id)
+                db.session.delete(user)
+                db.session.commit()
+                forget_feed_user(user.id)
+                return jsonify({'success': True, 'message': 'User deleted successfully'}), 201
+
+            existing_user = User.query.filter(User.email == email, User.id != int(user_id)).first()
+            if existing_user:
+                return jsonify({'success': False, 'error': 'This email is already taken.'}), 400
+
+            user.name = name
+            user.role = role
+            user.email = email
+            user.touch_calendar()
+            user.touch_profile()
+
+            if new_password:
+                user.password = hash_password(new_password)
+
+            db.session.commit()
+
+            # A new password logs the user out on every device.
+            if new_password:
+                revoke_user_sessions(current_app, user.id)
+
+            return jsonify({'success': True, 'message': 'User updated successfully.'}), 201
+
+        except Exception as e:
+            print(f"Server error: {e}")
+            return jsonify({'success': False, 'error': 'Internal Error'}), 500
+
+
+@admin_bp.route('/remove-role', methods=['POST'])
+@permission_required(MANAGE_ROLES)
+def remove_role():
+    role_id = request.form.get('role_id')
+
+    if not role_id:
+        return redirect(url_for('admin.admin'))
+
+    role = Roles.query.get(role_id)
+
+    if role.name in ['admin', 'user']:
+        return redirect(url_for('admin.admin'))
+
+    if not role:
+        return redirect(url_for('admin.admin'))
+
+    users = User.query.filter_by(role=role.name).all()
+
+    for user in users:
+        user.role = 'user'
+        user.touch_profile()
+
+    db.session.delete(role)
+    db.session.commit()
+    invalidate_permissions()
+
+    return redirect(url_for('admin.admin'))
+
+@admin_bp.route('/add-role', methods=['POST'])
+@permission_required(MANAGE_ROLES)
+def add_role():
+    if request.method == 'POST':
+        try:
+            role_name = request.form.get('role_name').strip().lower()
+
+            if not role_name:
+                return jsonify({'success': False, 'error': 'Please provide role name.'}), 400
+
+            if Roles.query.filter_by(name=role_name).first():
+                return jsonify({'success': False, 'error': 'This role already exists.'}), 400
+
+            new_role = Roles(name=role_name.lower(),
+                            color=generate_random_color(),
+                            icon=generate_random_icon(),
+                            root=False,
+                            permissions=format_permissions(request.form.getlist('permissions')))
+
+            db.session.add(new_role)
+            db.session.commit()
+            invalidate_permissions()
+
+            return jsonify({'success': True, 'message': 'New role created!'}), 201
+        except Exception as e:
+            print(e)
+            return jsonify({'success': False, 'error': 'Internal Error'}), 500
+
+    return jsonify({'success': False, 'error': 'Invalid request method.'}), 405
+
+
+# `permissions` is repeated once per checked box, unknown names are dropped. The admin role keeps every
+# permission, otherwise nobody could manage roles any more.
+@admin_bp.route('/role-permissions', methods=['POST'])
+@permission_required(MANAGE_ROLES)
+def set_role_permissions():
+    role = Roles.query.get(request.form.get('role_id', type=int) or 0)
+
+    if not role or role.name == 'admin':
+        return redirect(url_for('admin.admin'))
+
+    role.permissions = format_permissions(request.form.getlist('permissions'))
+    db.session.commit()
+    invalidate_permissions()
+
+    return redirect(url_for('admin.admin'))
+
+
+def _backup_dir():
+    return current_app.config.get('BACKUP_DIR') or os.path.join(current_app.instance_path, 'backups')
+
+
+# Online snapshot of the SQLite database, the app keeps serving while it runs.
+@admin_bp.route('/admin/backup', methods=['POST'])
+@permission_required(MANAGE_SYSTEM)
+def create_backup():
+    try:
+        report = backup_database(_backup_dir(), keep=current_app.config.get('BACKUP_KEEP', BACKUP_KEEP))
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
+    return jsonify({'status': 'success', **report.as_dict()})
+
+
+@admin_bp.cli.command('backup', help='Take an online, gzipped snapshot of the SQLite database and rotate old ones.')
+@click.option('--dir', 'directory', help='Defaults to BACKUP_DIR or instance/backups.')
+@click.option('--keep', type=int, help='Snapshots to keep, defaults to BACKUP_KEEP (7).')
+@click.option('--pages', default=256, show_default=True, help='Pages copied per step, -1 copies everything at once.')
+@click.option('--no-compress', is_flag=True, help='Write a plain .db file.')
+@click.option('--verify', is_flag=True, help='Run an integrity check on the new snapshot.')
+def backup_command(directory, keep, pages, no_compress, verify):
+    keep = keep if keep is not None else current_app.config.get('BACKUP_KEEP', BACKUP_KEEP)
+    report = backup_database(directory or _backup_dir(), keep=keep, pages=pages, compress=not no_compress)
+    result = report.as_dict()
+
+    if verify:
+        result['verify'] = verify_backup(report.path)
+
+    print(json.dumps(result, indent=2))
+
+    if verify and not result['verify']['ok']:
+        raise SystemExit(1)
+
+
+@admin_bp.cli.command('verify-backup', help='Check a snapshot with PRAGMA integrity_check and count its rows.')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+def verify_backup_command(path):
+    result = verify_backup(path)
+    print(json.dumps(result, indent=2))
+
+    if not result['ok']:
+        raise SystemExit(1)
+
+
+@admin_bp.cli.command('restore-backup', help='Verify a snapshot and restore it into TARGET (e.g. a fresh database file).')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.argument('target', type=click.Path(dir_okay=False))
+@click.option('--force', is_flag=True, help='Overwrite an existing TARGET.')
+def restore_backup_command(path, target, force):
+    if os.path.exists(target) and not force:
+        raise click.BadParameter(f'{target} exists, pass --force to overwrite it', param_hint='TARGET')
+
+    try:
+        result = restore_backup(path, target)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+    print(json.dumps(result, indent=2))
+
+
+@admin_bp.cli.command('sync-replica', help='Copy the primary SQLite database into the SQLite replica bind.')
+def sync_replica_command():
+    if REPLICA_BIND not in db.engines:
+        raise click.ClickException('DATABASE_REPLICA_URL is not configured')
+
+    try:
+        result = sync_replica(REPLICA_BIND)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+    print(json.dumps(result, indent=2))
+
+
+# Ages from the config unless given, see database.archive.
+def _archive_days(invoice_days=None, notification_days=None, event_days=None):
+    config = current_app.config
+
+    if invoice_days is None:
+        invoice_days = config.get('ARCHIVE_INVOICE_DAYS', ARCHIVE_INVOICE_DAYS)
+    if notification_days is None:
+        notification_days = config.get('ARCHIVE_NOTIFICATION_DAYS', ARCHIVE_NOTIFICATION_DAYS)
+    if event_days is None:
+        event_days = config.get('ARCHIVE_EVENT_DAYS', ARCHIVE_EVENT_DAYS)
+
+    return {'invoice_days': invoice_days, 'notification_days': notification_days, 'event_days': event_days}
+
+
+# VACUUM can hold the worker (and, on SQLite, every writer) for a long time on a big database. It is
+# left to the CLI command unless asked for with ?vacuum=1.
+@admin_bp.route('/admin/archive', methods=['POST'])
+@permission_required(MANAGE_SYSTEM)
+def archive_rows():
+    report = archive_old_rows(**_archive_days(),
+                              batch_size=current_app.config.get('ARCHIVE_BATCH_SIZE', ARCHIVE_BATCH_SIZE),
+                              vacuum=request.args.get('vacuum') == '1')
+
+    return jsonify({'status': 'success', **report.as_dict()})
+
+
+@admin_bp.cli.command('archive', help='Move old invoices, notifications and past events into the archive tables.')
+@click.option('--invoice-days', type=int, help='Defaults to ARCHIVE_INVOICE_DAYS (365).')
+@click.option('--notification-days', type=int, help='Defaults to ARCHIVE_NOTIFICATION_DAYS (90).')
+@click.option('--event-days', type=int, help='Defaults to ARCHIVE_EVENT_DAYS (365), counted from the last occurrence.')
+@click.option('--batch-size', default=ARCHIVE_BATCH_SIZE, show_default=True, help='Rows moved per transaction.')
+@click.option('--no-vacuum', is_flag=True, help='Skip VACUUM/ANALYZE afterwards.')
+def archive_command(invoice_days, notification_days, event_days, batch_size, no_vacuum):
+    report = archive_old_rows(**_archive_days(invoice_days, notification_days, event_days),
+                              batch_size=batch_size, vacuum=not no_vacuum)
+    print(json.dumps(report.as_dict(), indent=2))
+
+
+@admin_bp.cli.command('purge-sessions', help='Delete expired server-side sessions.')
+def purge_sessions_command():
+    store = getattr(current_app.session_interface, 'store', None)
+    print(f'Removed {store.purge() if store else 0} expired sessions.')
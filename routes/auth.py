@@ -0,0 +1,73 @@
+from flask import Blueprint, render_template, url_for, request, redirect, current_app
+from flask_login import login_user, logout_user, login_required, current_user
+
+from database.models.user import User
+
+from permissions import has_permission, ADMIN_PANEL
+from session_store import revoke_user_sessions
+from utils import check_hash_password, is_safe_url
+
+auth_bp = Blueprint('auth', __name__)
+
+
+@auth_bp.route('/')
+def index():
+    if current_user.is_authenticated:
+        if has_permission(ADMIN_PANEL):
+            return redirect(url_for('admin.admin'))
+        return redirect(url_for('team.team'))
+    return redirect(url_for('auth.login'))
+
+
+@auth_bp.route('/login', methods=['GET', 'POST'])
+def login():
+    if request.method == 'POST':
+
+        email = request.form['email']
+        password = request.form['password'].strip()
+        next_page = request.form.get('next') or request.args.get('next')
+
+        if not email or not password:
+            return render_template('login.html', error_message="Incorrect data. Please check your email and password.")
+
+        user = User.query.filter_by(email=email).first()
+
+        if user and check_hash_password(user.password, password):
+            login_user(user)
+
+            if next_page and is_safe_url(next_page):
+                return redirect(next_page)
+
+            if has_permission(ADMIN_PANEL):
+                return redirect(url_for('admin.admin'))
+
+            return redirect(url_for('team.team'))
+
+        else:
+            return render_template('login.html', error_message="Incorrect data. Please check your email and password.")
+
+    if current_user.is_authenticated:
+        return redirect(url_for('team.team'))
+
+
+    next_page = request.args.get('next')
+
+    if next_page:
+        return render_template('login.html', next=next_page)
+
+    return render_template('login.html')
+
+
+@auth_bp.route('/logout')
+def logout():
+    logout_user()
+    return redirect(url_for('auth.login'))
+
+
+# Ends every session of the current user, on all devices.
+@auth_bp.route('/logout-all', methods=['POST'])
+@login_required
+def logout_all():
+    revoke_user_sessions(current_app, current_user.id)
+    logout_user()
+    return redirect(url_for('auth.login'))
@@ -0,0 +1,189 @@
+from flask import Blueprint, render_template, request, jsonify
+from flask_login import login_required, current_user
+
+from database.db import db
+from database.models.availability import Availability
+from database.models.events import Event
+from database.models.archive import event_archive
+from database.recurrence import (occurrences, last_occurrence, normalize_rrule,
+                                 parse_exdates, format_exdates)
+
+from sqlalchemy import or_, select
+
+from datetime import date, datetime, timedelta
+
+calendar_bp = Blueprint('calendar', __name__)
+
+# Recurring events are expanded for this many days around today when no range is requested.
+DEFAULT_RANGE_DAYS = 366
+MAX_RANGE_DAYS = 3 * 366
+
+
+@calendar_bp.route('/calendar')
+@login_required
+def handle_calendar():
+    return render_template('calendar.html', active_page='calendar')
+
+@calendar_bp.route('/events/remove', methods=['POST'])
+@login_required
+def remove_event():
+    data = request.get_json()
+    event_id = data.get('event_id')
+    # With a date only that occurrence of a recurring event is removed.
+    occurrence = data.get('date')
+
+    event = Event.query.filter_by(id=event_id, user_id=current_user.id).first()
+    if event:
+        if occurrence and event.rrule:
+            try:
+                skipped = parse_exdates(event.exdates) | {date.fromisoformat(occurrence[:10])}
+            except ValueError:
+                return jsonify({'status': 'error', 'message': 'Date must be YYYY-MM-DD'}), 400
+
+            event.exdates = format_exdates(skipped)
+        else:
+            db.session.delete(event)
+
+        current_user.touch_calendar()
+        db.session.commit()
+        return jsonify({'status': 'success'})
+
+    return jsonify({'status': 'error', 'message': 'Event not found'})
+
+@calendar_bp.route('/view-user-events', methods=['GET'])
+@login_required
+def view_user_events():
+    user_id = request.args.get('user_id')
+
+    if not user_id:
+        return jsonify({'status': 'error', 'message': 'User ID is required'}), 400
+
+    return _events_response(user_id)
+
+
+@calendar_bp.route('/events/get')
+@login_required
+def get_events():
+    return _events_response(current_user.id)
+
+
+def _events_response(user_id):
+    try:
+        start, end = requested_range()
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
+    return jsonify(user_events(user_id, start, end, include_archived=request.args.get('archived') == '1'))
+
+
+# ?start=&end= as sent by FullCalendar (dates or ISO date-times, both ends inclusive).
+def requested_range():
+    today = date.today()
+    start, end = request.args.get('start'), request.args.get('end')
+
+    try:
+        start = datetime.fromisoformat(start).date() if start else today - timedelta(days=DEFAULT_RANGE_DAYS)
+        end = datetime.fromisoformat(end).date() if end else today + timedelta(days=DEFAULT_RANGE_DAYS)
+    except ValueError:
+        raise ValueError('start and end must be ISO 8601 dates')
+
+    if end < start or (end - start).days > MAX_RANGE_DAYS:
+        raise ValueError(f'Range must be at most {MAX_RANGE_DAYS} days')
+
+    return start, end
+
+
+# One row per series, occurrences are expanded in Python for the requested range only.
+# Archived events (see database.archive) only with include_archived, marked "archived": true.
+def user_events(user_id, start, end, include_archived=False):
+    tables = (Event.__table__, event_archive) if include_archived else (Event.__table__,)
+    events = []
+
+    for table in tables:
+        rows = db.session.execute(
+            select(table.c.id, table.c.start_date, table.c.title, table.c.rrule, table.c.exdates)
+            .where(table.c.user_id == user_id,
+                   table.c.start_date <= end,
+                   or_(table.c.last_date.is_(None), table.c.last_date >= start))
+        )
+
+        events.extend(
+            {
+                "id": event_id,
+                "start_date": day.isoformat(),
+                "title": title,
+                "rrule": rrule,
+                **({"archived": table is event_archive} if include_archived else {}),
+            }
+            for event_id, start_date, title, rrule, exdates in rows
+            for day in occurrences(start_date, rrule, exdates, start, end)
+        )
+
+    return events
+
+
+@calendar_bp.route('/events/save', methods=['POST'])
+@login_required
+def save_events():
+    data = request.get_json()
+    events = data.get('events', [])
+
+    for ev in events:
+        try:
+            start_date = datetime.fromisoformat(ev['start']).date()
+            rrule = normalize_rrule(ev['rrule']) if ev.get('rrule') else None
+            exdates = format_exdates(date.fromisoformat(day) for day in ev.get('exdates') or [])
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+
+        db.session.add(Event(user_id=current_user.id, start_date=start_date, title=ev['title'],
+                             rrule=rrule, exdates=exdates, last_date=last_occurrence(start_date, rrule)))
+
+    current_user.touch_calendar()
+    db.session.commit()
+    return jsonify({'status': 'success', 'message': 'Availability saved successfully'})
+
+
+@calendar_bp.route('/availability/save', methods=['POST'])
+@login_required
+def save_availability():
+    data = request.get_json()
+    events = data.get('events', [])
+
+    Availability.query.filter_by(user_id=current_user.id).delete()
+
+    for ev in events:
+        print(f"Original start: {ev['start']}")
+
+        # Parse the ISO string properly handling timezone
+        if ev['start'].endswith('Z'):
+            # Remove Z and parse as UTC
+            dt = datetime.fromisoformat(ev['start'].replace('Z', '+00:00'))
+        else:
+            dt = datetime.fromisoformat(ev['start'])
+
+        # Extract just the date part (ignoring time/timezone)
+        start_date = dt.date()
+        print(f"Parsed date: {start_date}")
+
+        db.session.add(Availability(user_id=current_user.id, start_date=start_date))
+
+    current_user.touch_calendar()
+    db.session.commit()
+    return jsonify({'status': 'success', 'message': 'Availability saved successfully'})
+
+@calendar_bp.route('/availability/get')
+@login_required
+def get_availability():
+
+    user_id = request.args.get('user_id') or current_user.id
+
+    dates = db.session.scalars(select(Availability.start_date).where(Availability.user_id == user_id))
+
+    return jsonify([
+        {
+            "start": start_date.isoformat(),  # Just date, no time
+            "allDay": True
+        }
+        for start_date in dates
+    ])
@@ -0,0 +1,264 @@
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from flask_login import login_required, current_user
+
+from database.db import db
+from database.models.invoices import InvoiceItem, Invoices
+from database.models.todo import Todo
+from database.models.events import Event
+from database.models.archive import invoices_archive, invoice_item_archive, event_archive
+
+from permissions import has_permission, VIEW_ALL
+
+from sqlalchemy import DateTime, literal, or_, select, union_all
+
+from datetime import date
+from itertools import groupby
+
+import csv
+import html
+import json
+
+export_bp = Blueprint('export', __name__)
+
+# Rows fetched per round trip and rows written per chunk, memory stays flat regardless of table size.
+EXPORT_BATCH_SIZE = 1000
+
+INVOICE_COLUMNS = ['id', 'title', 'user_id', 'date_created', 'status', 'from_address', 'note', 'total', 'item_count']
+ITEM_COLUMNS = ['item_id', 'item_name', 'item_price', 'item_quantity']
+TODO_COLUMNS = ['id', 'user_id', 'title', 'description', 'links', 'status', 'deadline']
+EVENT_COLUMNS = ['id', 'user_id', 'start_date', 'title', 'rrule', 'exdates']
+
+
+class _Line:
+    def write(self, value):
+        return value
+
+
+def _stream_rows(stmt):
+    result = db.session.execute(stmt.execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE))
+    for partition in result.partitions():
+        yield from partition
+
+
+def _csv_chunks(header, rows):
+    writer = csv.writer(_Line())
+    chunk = [writer.writerow(header)]
+
+    for row in rows:
+        chunk.append(writer.writerow(row))
+
+        if len(chunk) >= EXPORT_BATCH_SIZE:
+            yield ''.join(chunk)
+            chunk = []
+
+    if chunk:
+        yield ''.join(chunk)
+
+
+def _ndjson_chunks(records):
+    chunk = []
+
+    for record in records:
+        chunk.append(json.dumps(record, default=str) + '\n')
+
+        if len(chunk) >= EXPORT_BATCH_SIZE:
+            yield ''.join(chunk)
+            chunk = []
+
+    if chunk:
+        yield ''.join(chunk)
+
+
+def _export_response(name, fmt, chunks):
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    response = Response(stream_with_context(chunks), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename={name}.{fmt}'
+    return response
+
+
+# Users with VIEW_ALL (admins, founders) may export anyone (optionally filtered by ?user_id=), everybody else only themselves.
+# ?archived=1 adds archived rows (see database.archive) and an archived_at column, empty for live rows.
+def _export_filters():
+    filters = {'status': request.args.get('status'),
+               'start': request.args.get('start'),
+               'end': request.args.get('end'),
+               'user_id': request.args.get('user_id', type=int),
+               'archived': request.args.get('archived') == '1'}
+
+    for key in ('start', 'end'):
+        if filters[key]:
+            filters[key] = date.fromisoformat(filters[key])
+
+    if not has_permission(VIEW_ALL):
+        filters['user_id'] = current_user.id
+
+    return filters
+
+
+def _check_format(fmt):
+    if fmt not in ('csv', 'ndjson'):
+        return jsonify({'status': 'error', 'message': 'Format must be csv or ndjson'}), 400
+    return None
+
+
+# One row per item (or one with empty item columns), from the live tables or their archives.
+def _invoice_rows(invoices, items, filters):
+    columns = [invoices.c[name] for name in INVOICE_COLUMNS]
+    on = items.c.invoice_id == invoices.c.id
+
+    if invoices is invoices_archive:
+        columns.append(invoices.c.archived_at)
+        on &= items.c.archived_at == invoices.c.archived_at
+    elif filters['archived']:
+        columns.append(literal(None, DateTime).label('archived_at'))
+
+    stmt = select(*columns, items.c.id.label('item_id'), items.c.name, items.c.price, items.c.quantity) \
+        .outerjoin(items, on)
+
+    if filters['user_id']:
+        stmt = stmt.where(invoices.c.user_id == filters['user_id'])
+    if filters['status']:
+        stmt = stmt.where(invoices.c.status == filters['status'])
+    # date_created holds the ISO date from the upload form, string comparison keeps date order.
+    if filters['start']:
+        stmt = stmt.where(invoices.c.date_created >= filters['start'].isoformat())
+    if filters['end']:
+        stmt = stmt.where(invoices.c.date_created <= filters['end'].isoformat())
+
+    return stmt
+
+
+# Titles and item names are stored HTML-escaped (see routes.invoices), exports carry them as typed so
+# the file can be imported again without escaping them twice.
+def _unescape_invoice_rows(rows, width):
+    title, item_name = INVOICE_COLUMNS.index('title'), width + ITEM_COLUMNS.index('item_name')
+
+    for row in rows:
+        row = list(row)
+        for index in (title, item_name):
+            if row[index] is not None:
+                row[index] = html.unescape(row[index])
+        yield row
+
+
+@export_bp.route('/export/invoices.<fmt>')
+@login_required
+def export_invoices(fmt):
+    error = _check_format(fmt)
+    if error:
+        return error
+
+    try:
+        filters = _export_filters()
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'Dates must be YYYY-MM-DD'}), 400
+
+    if filters['archived']:
+        rows = union_all(_invoice_rows(Invoices.__table__, InvoiceItem.__table__, filters),
+                         _invoice_rows(invoices_archive, invoice_item_archive, filters)).subquery()
+        stmt = select(rows).order_by(rows.c.id, rows.c.archived_at, rows.c.item_id)
+        columns = INVOICE_COLUMNS + ['archived_at']
+    else:
+        stmt = _invoice_rows(Invoices.__table__, InvoiceItem.__table__, filters).order_by(Invoices.id, InvoiceItem.id)
+        columns = INVOICE_COLUMNS
+
+    width = len(columns)
+    # An archived invoice may share its id with a live one, archived_at tells them apart.
+    invoice_key = (lambda row: (row[0], row[width - 1])) if filters['archived'] else (lambda row: row[0])
+
+    # CSV: one line per item with the invoice columns repeated. NDJSON: one object per invoice.
+    item_rows = _unescape_invoice_rows(_stream_rows(stmt), width)
+
+    if fmt == 'csv':
+        return _export_response('invoices', fmt, _csv_chunks(columns + ITEM_COLUMNS, item_rows))
+
+    def records():
+        for _, rows in groupby(item_rows, key=invoice_key):
+            rows = list(rows)
+            record = dict(zip(columns, rows[0][:width]))
+            record['items'] = [dict(zip(['id', 'name', 'price', 'quantity'], row[width:]))
+                               for row in rows if row[width] is not None]
+            yield record
+
+    return _export_response('invoices', fmt, _ndjson_chunks(records()))
+
+
+@export_bp.route('/export/todos.<fmt>')
+@login_required
+def export_todos(fmt):
+    error = _check_format(fmt)
+    if error:
+        return error
+
+    try:
+        filters = _export_filters()
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'Dates must be YYYY-MM-DD'}), 400
+
+    stmt = select(Todo.id, Todo.user_id, Todo.title, Todo.description,
+                  Todo.links, Todo.status, Todo.deadline).order_by(Todo.id)
+
+    # Todo.user_id is a string column.
+    if filters['user_id']:
+        stmt = stmt.where(Todo.user_id == str(filters['user_id']))
+    if filters['status']:
+        stmt = stmt.where(Todo.status == filters['status'])
+    if filters['start']:
+        stmt = stmt.where(Todo.deadline >= filters['start'].isoformat())
+    if filters['end']:
+        stmt = stmt.where(Todo.deadline <= filters['end'].isoformat())
+
+    if fmt == 'csv':
+        return _export_response('todos', fmt, _csv_chunks(TODO_COLUMNS, _stream_rows(stmt)))
+
+    records = (dict(zip(TODO_COLUMNS, row)) for row in _stream_rows(stmt))
+    return _export_response('todos', fmt, _ndjson_chunks(records))
+
+
+@export_bp.route('/export/events.<fmt>')
+@login_required
+def export_events(fmt):
+    error = _check_format(fmt)
+    if error:
+        return error
+
+    try:
+        filters = _export_filters()
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'Dates must be YYYY-MM-DD'}), 400
+
+    if filters['archived']:
+        rows = union_all(_event_rows(Event.__table__, filters), _event_rows(event_archive, filters)).subquery()
+        stmt = select(rows).order_by(rows.c.id, rows.c.archived_at)
+        columns = EVENT_COLUMNS + ['archived_at']
+    else:
+        stmt = _event_rows(Event.__table__, filters).order_by(Event.id)
+        columns = EVENT_COLUMNS
+
+    if fmt == 'csv':
+        return _export_response('events', fmt, _csv_chunks(columns, _stream_rows(stmt)))
+
+    records = (dict(zip(columns, row)) for row in _stream_rows(stmt))
+    return _export_response('events', fmt, _ndjson_chunks(records))
+
+
+def _event_rows(events, filters):
+    columns = [events.c[name] for name in EVENT_COLUMNS]
+
+    if events is event_archive:
+        columns.append(events.c.archived_at)
+    elif filters['archived']:
+        columns.append(literal(None, DateTime).label('archived_at'))
+
+    stmt = select(*columns)
+
+    if filters['user_id']:
+        stmt = stmt.where(events.c.user_id == filters['user_id'])
+    # A series is exported once, as its row, when its start_date..last_date span overlaps the range
+    # (same test as routes.calendar.user_events).
+    if filters['start']:
+        stmt = stmt.where(or_(events.c.last_date.is_(None), events.c.last_date >= filters['start']))
+    if filters['end']:
+        stmt = stmt.where(events.c.start_date <= filters['end'])
+
+    return stmt
@@ -0,0 +1,224 @@
+from flask import Blueprint, Response, request, jsonify, url_for, abort
+from flask_login import login_required, current_user
+
+from database.db import db
+from database.models.user import User
+from database.models.events import Event
+from database.models.availability import Availability
+
+from sqlalchemy import func, select
+
+from datetime import datetime, timedelta, timezone
+
+import hashlib
+import secrets
+import threading
+
+feeds_bp = Blueprint('feeds', __name__)
+
+UID_DOMAIN = 'team-dashboard'
+CALENDAR_HEADER = ('BEGIN:VCALENDAR\r\n'
+                   'VERSION:2.0\r\n'
+                   'PRODID:-//Team Dashboard//Calendar//EN\r\n'
+                   'CALSCALE:GREGORIAN\r\n')
+
+# Rendered VEVENT blocks per (user_id, team), tagged with the calendar_version they were built from.
+_fragments = {}
+# Last full body per feed, served again while its ETag still matches.
+_feeds = {}
+_lock = threading.Lock()
+
+
+def hash_token(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _escape(value):
+    return (value.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+# RFC 5545 caps content lines at 75 octets, the rest continues on lines starting with a space.
+def _fold(line):
+    if len(line.encode()) <= 75:
+        return line + '\r\n'
+
+    parts, current, size = [], '', 0
+    for char in line:
+        width = len(char.encode())
+
+        if size + width > 75:
+            parts.append(current)
+            current, size = ' ', 1
+
+        current += char
+        size += width
+
+    parts.append(current)
+    return '\r\n'.join(parts) + '\r\n'
+
+
+# Recurring events keep their RRULE/EXDATE, calendar clients expand them themselves.
+def _vevent(uid, day, summary, stamp, transparent=False, rrule=None, exdates=None):
+    lines = ['BEGIN:VEVENT',
+             f'UID:{uid}@{UID_DOMAIN}',
+             f'DTSTAMP:{stamp}',
+             f'DTSTART;VALUE=DATE:{day:%Y%m%d}',
+             f'DTEND;VALUE=DATE:{day + timedelta(days=1):%Y%m%d}',
+             f'SUMMARY:{_escape(summary)}']
+
+    if rrule:
+        lines.append(f'RRULE:{rrule}')
+    if exdates:
+        lines.append('EXDATE;VALUE=DATE:' + ','.join(day.replace('-', '') for day in exdates.split(',')))
+    if transparent:
+        lines.append('TRANSP:TRANSPARENT')
+
+    lines.append('END:VEVENT')
+    return ''.join(_fold(line) for line in lines)
+
+
+# `names` maps user_id -> name for the users to render, one query per table for all of them.
+def _render_fragments(names, team):
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    chunks = {user_id: [] for user_id in names}
+
+    events = db.session.execute(
+        select(Event.user_id, Event.id, Event.start_date, Event.title, Event.rrule, Event.exdates)
+        .where(Event.user_id.in_(names))
+        .order_by(Event.start_date, Event.id)
+    )
+    for user_id, event_id, start_date, title, rrule, exdates in events:
+        summary = f'{names[user_id]}: {title}' if team else title
+        chunks[user_id].append(_vevent(f'event-{event_id}', start_date, summary, stamp,
+                                       rrule=rrule, exdates=exdates))
+
+    availability = db.session.execute(
+        select(Availability.user_id, Availability.id, Availability.start_date)
+        .where(Availability.user_id.in_(names))
+        .order_by(Availability.start_date)
+    )
+    for user_id, availability_id, start_date in availability:
+        summary = f'{names[user_id]}: available' if team else 'Available'
+        chunks[user_id].append(_vevent(f'availability-{availability_id}', start_date, summary, stamp,
+                                       transparent=True))
+
+    return {user_id: ''.join(parts) for user_id, parts in chunks.items()}
+
+
+# `users` is a list of (id, name, calendar_version); only users whose version moved are rendered again.
+def _user_fragments(users, team):
+    with _lock:
+        cached = {user_id: _fragments.get((user_id, team)) for user_id, _, _ in users}
+
+    stale = {user_id: name for user_id, name, version in users
+             if cached[user_id] is None or cached[user_id][0] != version}
+
+    if stale:
+        versions = {user_id: version for user_id, _, version in users}
+        rendered = _render_fragments(stale, team)
+
+        with _lock:
+            for user_id, fragment in rendered.items():
+                cached[user_id] = _fragments[(user_id, team)] = (versions[user_id], fragment)
+
+    return [cached[user_id][1] for user_id, _, _ in users]
+
+
+# Called when a user is deleted. Other workers never match the stale entries, a new user reusing the id
+# starts at another random calendar_version.
+def forget_user(user_id):
+    with _lock:
+        _fragments.pop((user_id, False), None)
+        _fragments.pop((user_id, True), None)
+        _feeds.pop(('user', user_id), None)
+        _feeds.pop(('team',), None)
+
+
+def _calendar(name, fragments):
+    return CALENDAR_HEADER + _fold(f'X-WR-CALNAME:{_escape(name)}') + ''.join(fragments) + 'END:VCALENDAR\r\n'
+
+
+# Weak ETags, the body may still be gzipped on the way out.
+def _feed_response(key, etag, build):
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        with _lock:
+            cached = _feeds.get(key)
+
+        if cached and cached[0] == etag:
+            body = cached[1]
+        else:
+            body = build()
+            with _lock:
+                _feeds[key] = (etag, body)
+
+        response = Response(body, mimetype='text/calendar')
+
+    response.set_etag(etag, weak=True)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+def _token_user(token):
+    user = db.session.execute(
+        select(User.id, User.name, User.calendar_version).where(User.calendar_token == hash_token(token))
+    ).first()
+
+    if user is None:
+        abort(404)
+
+    return user
+
+
+@feeds_bp.route('/calendar/feed-token', methods=['POST', 'DELETE'])
+@login_required
+def feed_token():
+    if request.method == 'DELETE':
+        current_user.calendar_token = None
+        db.session.commit()
+        return jsonify({'status': 'success', 'message': 'Calendar feeds disabled'})
+
+    # Only the hash is stored, a new token replaces (and revokes) the previous one.
+    token = secrets.token_urlsafe(32)
+    current_user.calendar_token = hash_token(token)
+    db.session.commit()
+
+    return jsonify({
+        'status': 'success',
+        'user_feed': url_for('feeds.user_feed', token=token, _external=True),
+        'team_feed': url_for('feeds.team_feed', token=token, _external=True),
+    })
+
+
+@feeds_bp.route('/calendar/<token>/me.ics')
+def user_feed(token):
+    user = _token_user(token)
+
+    return _feed_response(('user', user.id), f'u{user.id}-{user.calendar_version}',
+                          lambda: _calendar(user.name, _user_fragments([tuple(user)], team=False)))
+
+
+@feeds_bp.route('/calendar/<token>/team.ics')
+def team_feed(token):
+    _token_user(token)
+
+    # Versions only grow and deleting a user changes the count. A new user taking a deleted user's id
+    # keeps count and max id, but starts at a random version, so the sum moves as well.
+    count, versions, last_id = db.session.execute(
+        select(func.count(User.id), func.coalesce(func.sum(User.calendar_version), 0), func.max(User.id))
+    ).one()
+
+    def build():
+        users = db.session.execute(select(User.id, User.name, User.calendar_version).order_by(User.id)).all()
+
+        with _lock:
+            ids = {user_id for user_id, _, _ in users}
+            for key in [key for key in _fragments if key[1] and key[0] not in ids]:
+                del _fragments[key]
+
+        return _calendar('Team', _user_fragments([tuple(user) for user in users], team=True))
+
+    return _feed_response(('team',), f'team-{count}-{versions}-{last_id}', build)
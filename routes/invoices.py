@@ -0,0 +1,322 @@
+from flask import Blueprint, render_template, url_for, request, make_response, redirect, jsonify, abort
+from flask_login import login_required, current_user
+
+from database.db import db
+from database.models.invoices import InvoiceItem, Invoices, refresh_invoice_totals
+from database.models.archive import invoices_archive, invoice_item_archive
+from database.importer import READERS, import_invoices, validate_item
+
+from sqlalchemy import select
+
+from utils import generate_random_color, LazyModule
+from permissions import permission_required, has_permission, MANAGE_INVOICES, VIEW_ALL
+
+from io import BytesIO, TextIOWrapper
+from markupsafe import escape
+
+import click
+import csv
+import json
+import os
+
+
+# ReportLab is the heaviest import in the app and only the PDF route needs it.
+pagesizes = LazyModule('reportlab.lib.pagesizes')
+colors = LazyModule('reportlab.lib.colors')
+rl_styles = LazyModule('reportlab.lib.styles')
+platypus = LazyModule('reportlab.platypus')
+
+invoices_bp = Blueprint('invoices', __name__)
+
+
+# JSON key -> column for invoice listings, only these columns are selected.
+INVOICE_LISTING_COLUMNS = {
+    'id': Invoices.id,
+    'title': Invoices.title,
+    'status': Invoices.status,
+    'color': Invoices.color,
+    'from': Invoices.from_address,
+    'date_created': Invoices.date_created,
+    'note': Invoices.note,
+    'total': Invoices.total,
+    'item_count': Invoices.item_count,
+}
+
+
+# Archived invoices (see database.archive) are only listed with ?archived=1, marked with "archived": true.
+def include_archived():
+    return request.args.get('archived') == '1'
+
+
+# FIXED: change on prod
+@invoices_bp.route('/invoices/filter')
+@login_required
+def invoice_filter():
+    status = request.args.get('status')
+
+    is_admin = 'admin' in (request.referrer or '')
+    archived = include_archived()
+
+    keys = list(INVOICE_LISTING_COLUMNS)
+    listing = []
+
+    for table in (Invoices.__table__, invoices_archive) if archived else (Invoices.__table__,):
+        stmt = select(*(table.c[column.key] for column in INVOICE_LISTING_COLUMNS.values()))
+
+        if is_admin and has_permission(VIEW_ALL):
+            if status != 'all':
+                stmt = stmt.where(table.c.status == status)
+        else:
+            stmt = stmt.where(table.c.status == status, table.c.user_id == current_user.id)
+
+        for row in db.session.execute(stmt):
+            record = dict(zip(keys, row))
+            if archived:
+                record['archived'] = table is invoices_archive
+            listing.append(record)
+
+    return jsonify(listing)
+
+
+# Line items are only loaded when an invoice is opened, listings use the stored totals.
+@invoices_bp.route('/invoices/<int:invoice_id>/items')
+@login_required
+def invoice_items(invoice_id):
+    invoice = db.session.get(Invoices, invoice_id)
+    items = select(InvoiceItem.name, InvoiceItem.price, InvoiceItem.quantity) \
+        .where(InvoiceItem.invoice_id == invoice_id)
+
+    # Ids can come back after archival (SQLite), the latest archived invoice wins.
+    if invoice is None and include_archived():
+        invoice = db.session.execute(
+            select(invoices_archive.c.user_id, invoices_archive.c.total, invoices_archive.c.archived_at)
+            .where(invoices_archive.c.id == invoice_id)
+            .order_by(invoices_archive.c.archived_at.desc())
+        ).first()
+
+        if invoice is not None:
+            items = select(invoice_item_archive.c.name, invoice_item_archive.c.price, invoice_item_archive.c.quantity) \
+                .where(invoice_item_archive.c.invoice_id == invoice_id,
+                       invoice_item_archive.c.archived_at == invoice.archived_at)
+
+    if invoice is None:
+        abort(404)
+
+    if invoice.user_id != current_user.id and not has_permission(VIEW_ALL):
+        return jsonify({'status': 'error', 'message': 'Invoice not found'}), 404
+
+    items = db.session.execute(items)
+
+    # Names are escaped once when they are written (upload/import), no need to escape them again here.
+    return jsonify({
+        'total': invoice.total,
+        'items': [
+            {'name': name, 'price': price, 'quantity': quantity}
+            for name, price, quantity in items
+        ]
+    })
+
+@invoices_bp.route('/invoices')
+@login_required
+def invoices():
+
+    invoice_items = Invoices.query.filter_by(status="requested", user_id=current_user.id).all()
+
+    return render_template(
+        'invoices.html',
+        active_page='invoices',
+        _invoices=invoice_items
+    )
+
+@invoices_bp.route('/remove-invoice', methods=['POST'])
+@login_required
+def remove_invoice():
+    invoice_id = request.form.get('invoice_id')
+
+    if not invoice_id:
+        return redirect(url_for('invoices.invoices'))
+
+    invoice = Invoices.query.get(invoice_id)
+
+    if not invoice:
+        return redirect(url_for('invoices.invoices'))
+
+    if current_user.invoices_count > 0:
+        current_user.invoices_count -= 1
+
+    db.session.delete(invoice)
+    db.session.commit()
+
+    return redirect(url_for('invoices.invoices'))
+
+
+@invoices_bp.route('/invoice-upload', methods=['POST'])
+@login_required
+def invoice_upload():
+
+    title = request.form.get('title')
+    date = request.form.get('date')
+    from_address = request.form.get('from', '').strip()
+
+    item_names = request.form.getlist('item_name[]')
+    item_prices = request.form.getlist('item_price[]')
+    item_qtys = request.form.getlist('item_qty[]')
+
+    if not title or not date or not item_names or not from_address:
+        return redirect(url_for('invoices.invoices'))
+
+    # Same checks as the bulk import, a price like "1e400" can't be rounded to cents.
+    items = []
+    for name, price, qty in zip(item_names, item_prices, item_qtys):
+        item, error = validate_item({'name': name, 'price': price, 'quantity': qty})
+        if error:
+            return jsonify({'status': 'error', 'message': error}), 400
+        items.append(item)
+
+    invoice = Invoices(
+        title=escape(title),
+        date_created=date,
+        user_id=current_user.id,
+        color=generate_random_color(),
+        from_address=from_address
+    )
+
+    db.session.add(invoice)
+
+    for item in items:
+        invoice.add_item(**item)
+
+    current_user.invoices_count += 1
+
+    db.session.commit()
+
+    return redirect(url_for('invoices.invoices'))
+
+# Bulk import for migrations: CSV (one line per item) or NDJSON/JSON (one object per invoice).
+@invoices_bp.route('/invoices/import', methods=['POST'])
+@permission_required(MANAGE_INVOICES)
+def invoice_import():
+    file = request.files.get('file')
+
+    if not file or not file.filename:
+        return jsonify({'status': 'error', 'message': 'No file provided'}), 400
+
+    fmt = request.args.get('format') or file.filename.rsplit('.', 1)[-1].lower()
+
+    if fmt not in READERS:
+        return jsonify({'status': 'error', 'message': 'Format must be csv, ndjson or json'}), 400
+
+    try:
+        report = import_invoices(TextIOWrapper(file.stream, encoding='utf-8-sig', newline=''), fmt)
+    except (ValueError, csv.Error) as e:
+        return jsonify({'status': 'error', 'message': f'Could not read file: {e}'}), 400
+
+    return jsonify({'status': 'success', **report.as_dict()})
+
+
+@invoices_bp.route('/download-invoice-pdf/<int:invoice_id>', methods=['GET'])
+@login_required
+def download_invoice_pdf(invoice_id):
+    invoice = Invoices.query.get_or_404(invoice_id)
+    items = InvoiceItem.query.filter_by(invoice_id=invoice_id).all()
+
+    buffer = BytesIO()
+    doc = platypus.SimpleDocTemplate(buffer, pagesize=pagesizes.A4)
+    styles = rl_styles.getSampleStyleSheet()
+    story = []
+
+    # Header
+    story.append(platypus.Paragraph("<b>Team Dashboard</b>", styles['Title']))
+    story.append(platypus.Paragraph("255 S Orange Avenue<br/>Suite 104 #2397<br/>Orlando, FL, 23801", styles['Normal']))
+    story.append(platypus.Spacer(1, 20))
+
+    story.append(platypus.Paragraph(f"From: {invoice.from_address}"))
+    story.append(platypus.Spacer(1, 20))
+
+    # Invoice info
+    story.append(platypus.Paragraph(f"<b>Invoice #{invoice.id}</b>", styles['Heading2']))
+    story.append(platypus.Paragraph(f"Date: {invoice.date_created}", styles['Normal']))
+    story.append(platypus.Spacer(1, 20))
+
+    # Items table
+    table_data = [['Description', 'Quantity', 'Price', 'Amount']]
+
+    for item in items:
+        item_total = item.price * item.quantity
+        table_data.append([
+            item.name,
+            str(item.quantity),
+            f"${item.price:.2f}",
+            f"${item_total:.2f}"
+        ])
+
+    # Add total row
+    table_data.append(['', '', 'Total', f'${invoice.total:.2f}'])
+
+    table = platypus.Table(table_data, colWidths=[200, 60, 80, 80])
+    table.setStyle(platypus.TableStyle([
+        # Header row styling
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+
+        # Data rows styling
+        ('BACKGROUND', (0, 1), (-1, -2), colors.white),
+        ('ALIGN', (1, 1), (-1, -1), 'RIGHT'),  # Right align numbers
+        ('ALIGN', (0, 1), (0, -1), 'LEFT'),    # Left align descriptions
+
+        # Total row styling
+        ('BACKGROUND', (0, -1), (-1, -1), colors.beige),
+        ('FONTNAME', (2, -1), (-1, -1), 'Helvetica-Bold'),
+
+        # Grid
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ]))
+
+    story.append(table)
+
+    # Add note if exists
+    if invoice.note and invoice.note != 'No additional notes provided.':
+        story.append(platypus.Spacer(1, 20))
+        story.append(platypus.Paragraph("<b>Notes:</b>", styles['Heading3']))
+        story.append(platypus.Paragraph(invoice.note, styles['Normal']))
+
+    doc.build(story)
+
+    buffer.seek(0)
+
+    response = make_response(buffer.getvalue())
+    response.headers['Content-Type'] = 'application/pdf'
+    response.headers['Content-Disposition'] = f'attachment; filename=invoice_{invoice.id}.pdf'
+
+    return response
+
+
+@invoices_bp.cli.command('backfill-totals', help='Recompute stored invoice totals and item counts from their items.')
+def backfill_totals():
+    updated = refresh_invoice_totals()
+    db.session.commit()
+    print(f'Updated {updated} invoices.')
+
+
+@invoices_bp.cli.command('import', help='Import invoices from a CSV, NDJSON or JSON file.')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(sorted(READERS)), help='Defaults to the file extension.')
+@click.option('--batch-size', default=500, show_default=True, help='Invoices per transaction.')
+def import_command(path, fmt, batch_size):
+    fmt = fmt or os.path.splitext(path)[1].lstrip('.').lower()
+
+    if fmt not in READERS:
+        raise click.BadParameter('format must be csv, ndjson or json', param_hint='--format')
+
+    with open(path, encoding='utf-8-sig', newline='') as stream:
+        try:
+            report = import_invoices(stream, fmt, batch_size=batch_size)
+        except (ValueError, csv.Error) as e:
+            raise click.ClickException(f'Could not read {path}: {e}')
+
+    print(json.dumps(report.as_dict(), indent=2))
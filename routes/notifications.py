@@ -0,0 +1,64 @@
+from flask import Blueprint, request, jsonify
+from flask_login import login_required, current_user
+
+from database.db import db
+from database.models.notification import Notification
+from database.models.archive import notification_archive
+from database.models.user import touch_notifications
+
+from sqlalchemy import select
+
+NOTIFICATION_COLUMNS = ['id', 'title', 'redirect', 'created_at']
+
+notifications_bp = Blueprint('notifications', __name__)
+
+
+# Called by sidebar.html, which only renders (and queries) them again after notification_version moved.
+@notifications_bp.app_context_processor
+def inject_data():
+    def user_notifications():
+        if current_user.is_authenticated:
+            return Notification.query.filter_by(user_id=current_user.id).all()
+        return []
+
+    return dict(user_notifications=user_notifications)
+
+
+# The current user's notifications, newest first. Archived ones (see database.archive) only with
+# ?archived=1, marked with "archived": true.
+@notifications_bp.route('/notifications')
+@login_required
+def list_notifications():
+    archived = request.args.get('archived') == '1'
+    listing = []
+
+    for table in (Notification.__table__, notification_archive) if archived else (Notification.__table__,):
+        rows = db.session.execute(
+            select(*(table.c[name] for name in NOTIFICATION_COLUMNS))
+            .where(table.c.user_id == current_user.id)
+        )
+
+        for row in rows:
+            record = dict(zip(NOTIFICATION_COLUMNS, row))
+            if archived:
+                record['archived'] = table is notification_archive
+            listing.append(record)
+
+    listing.sort(key=lambda record: (record['created_at'] is not None, record['created_at']), reverse=True)
+    return jsonify(listing)
+
+
+@notifications_bp.route('/notification/delete', methods=['POST'])
+@login_required
+def delete_notification():
+    data = request.get_json()
+    notification_id = data.get('notification_id')
+    notification = Notification.query.filter_by(id=notification_id, user_id=current_user.id).first()
+
+    if notification:
+        db.session.delete(notification)
+        touch_notifications([current_user.id])
+        db.session.commit()
+        return jsonify({'status': 'success'})
+
+    return jsonify({'status': 'error', 'message': 'Notification not found'}), 404
@@ -0,0 +1,96 @@
+from flask import Blueprint, render_template, url_for, request, redirect, flash, current_app
+from flask_login import login_required, current_user
+
+from database.db import db
+from database.models.user import User
+
+from werkzeug.utils import secure_filename
+from markupsafe import escape
+
+import os
+
+profile_bp = Blueprint('profile', __name__)
+
+
+@profile_bp.route('/profile')
+@login_required
+def profile():
+    return render_template('profile.html', active_page='profile')
+
+@profile_bp.route('/edit-profile', methods=['POST'])
+@login_required
+def edit_profile():
+    name = request.form.get('name').strip()
+    bio = request.form.get('bio').strip()
+    email = request.form.get('email')
+
+    existing_user = User.query.filter_by(email=email).first()
+    if existing_user and existing_user.id != current_user.id:
+        flash("This email already exists", 'warning')
+        return redirect(url_for('profile.profile'))
+
+    if len(name) > 20:
+        flash("Name is too long", 'warning')
+        return redirect(url_for('profile.profile'))
+
+    if len(bio) > 100:
+        flash("Bio is too long", 'warning')
+        return redirect(url_for('profile.profile'))
+
+    if len(email) > 50:
+        flash("Email is too long", 'warning')
+        return redirect(url_for('profile.profile'))
+
+    if not name or not bio or not email:
+        flash('Please fill out all fields.', 'warning')
+        return redirect(url_for('profile.profile'))
+
+    current_user.name = name
+    current_user.bio = escape(bio)
+    current_user.email = email
+    # The name is part of the team calendar feed.
+    current_user.touch_calendar()
+    current_user.touch_profile()
+
+    db.session.commit()
+
+    flash('Profile updated successfuly!', 'info')
+    return redirect(url_for('profile.profile'))
+
+
+@profile_bp.app_errorhandler(413)
+def handle_413(error):
+    return redirect(url_for('profile.profile'))
+
+
+@profile_bp.route('/upload-avatar', methods=['POST'])
+@login_required
+def upload_avatar():
+
+    if request.method == 'POST':
+        file = request.files.get('avatar')
+
+        if file and '.' in file.filename and file.filename.rsplit('.', 1)[1].lower() in current_app.config['ALLOWED_EXTENSIONS']:
+            filename = secure_filename(file.filename)
+            user_id = current_user.id
+            file_ext = filename.rsplit('.', 1)[1].lower()
+            avatar_filename = f"user_{user_id}.{file_ext}"
+
+            file.save(os.path.join(current_app.config['UPLOAD_FOLDER'], avatar_filename))
+
+            current_user.profile_img = f"images/{avatar_filename}"
+            current_user.touch_profile()
+            db.session.commit()
+
+            return redirect(url_for('profile.profile'))
+
+    return redirect(url_for('profile.profile'))
+
+@profile_bp.route('/delete-avatar', methods=['POST'])
+@login_required
+def delete_avatar():
+    current_user.profile_img = f'images/default-profile.jpg'
+    current_user.touch_profile()
+    db.session.commit()
+
+    return redirect(url_for('profile.profile'))
@@ -0,0 +1,20 @@
+from flask import Blueprint, render_template
+from flask_login import login_required
+
+from database.models.user import User
+
+team_bp = Blueprint('team', __name__)
+
+
+@team_bp.route('/team')
+@login_required
+def team():
+    admins = User.query.filter(User.role.in_(['admin', 'founder'])).all()
+    managers = User.query.filter_by(role='manager').all()
+    others = User.query.filter(~User.role.in_(['admin', 'manager', 'founder'])).all()
+
+    return render_template('team.html',
+                           active_page='team',
+                           admins=admins,
+                           managers=managers,
+                           others=others)
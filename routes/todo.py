@@ -0,0 +1,111 @@
+from flask import Blueprint, render_template, url_for, request, redirect, jsonify
+from flask_login import login_required, current_user
+
+from database.db import db
+from database.models.todo import Todo
+from database.models.events import Event
+
+from utils import generate_random_color
+
+from datetime import datetime
+
+todo_bp = Blueprint('todo', __name__)
+
+
+@todo_bp.route('/todo')
+@login_required
+def todo():
+    todos = Todo.query.filter_by(user_id=current_user.id).all()
+
+    return render_template('todo.html',
+                           active_page='todo',
+                           todos=todos)
+
+
+@todo_bp.route('/update-todo', methods=['POST'])
+@login_required
+def update_todo():
+
+    if request.args.get('todo_id'):
+        todo_id = request.args.get('todo_id')
+        todo = Todo.query.get(todo_id)
+
+        todo_id = request.args.get('todo_id')
+        status = request.args.get('status')
+
+        if not todo:
+            return jsonify({'status': 'error', 'message': 'Todo not found or access denied'}), 404
+
+        if status == 'removed':
+            if current_user.todo_count > 0:
+                current_user.todo_count -= 1
+
+            db.session.delete(todo)
+            db.session.commit()
+            return jsonify({'status': 'success', 'message': 'Todo removed successfully'})
+
+        todo.status = status
+
+        db.session.commit()
+
+        return jsonify({'status': 'success', 'message': 'Todo updated successfully'})
+
+    todo_id = request.form.get('todo_id')
+    title = request.form.get('title').strip()
+    description = request.form.get('description').strip()
+    links = request.form.get('links', '')
+    deadline = request.form.get('date').strip()
+
+    if not todo_id or not title or not description or not deadline:
+        return redirect(url_for('todo.todo'))
+
+    todo = Todo.query.get(todo_id)
+
+    todo.title = title
+    todo.description = description
+    todo.links = links
+    todo.deadline = deadline
+
+    db.session.commit()
+
+    return redirect(url_for('todo.todo'))
+
+
+@todo_bp.route('/add-todo', methods=['POST'])
+@login_required
+def add_todo():
+    title = request.form.get('title').strip()
+    description = request.form.get('description').strip()
+    links = request.form.get('links').strip()
+    deadline = request.form.get('date').strip()
+
+    if not title or not description or not deadline:
+        return redirect(url_for('todo.todo'))
+
+    _todo = Todo(
+        title=title,
+        description=description,
+        links=links,
+        status='doing',
+        color=generate_random_color(),
+        deadline=deadline,
+        user_id=current_user.id
+    )
+
+    deadline_date = datetime.fromisoformat(deadline).date()
+
+    calendar = Event(
+        user_id=current_user.id,
+        start_date=deadline_date,
+        last_date=deadline_date,
+        title=f"ToDo: {title}"[:100]
+    )
+
+    current_user.todo_count += 1
+    current_user.touch_calendar()
+    db.session.add(_todo)
+    db.session.add(calendar)
+
+    db.session.commit()
+
+    return redirect(url_for('todo.todo'))
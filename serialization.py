@@ -0,0 +1,80 @@
+import gzip
+
+from decimal import Decimal
+
+# Flask related
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+COMPRESSIBLE_MIMETYPES = ['application/json', 'text/html', 'text/csv', 'application/x-ndjson', 'text/calendar']
+
+
+def _orjson_default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if hasattr(value, '__html__'):
+        return str(value.__html__())
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+# jsonify() through orjson when it is installed. Unlike the default provider keys are not sorted
+# and dates come out as ISO 8601, every endpoint formats its dates itself anyway. Non-string keys
+# (e.g. ids) become strings, as with the stdlib encoder.
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_orjson_default, option=ORJSON_OPTIONS).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=_orjson_default, option=ORJSON_OPTIONS)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def init_json(app):
+    if orjson is not None and app.config.get('ORJSON_ENABLED', True):
+        app.json = OrjsonProvider(app)
+
+
+# Gzip for large, fully buffered responses; streamed exports and static files are left alone.
+def init_compression(app):
+    if not app.config.get('COMPRESS_RESPONSES', True):
+        return
+
+    min_size = app.config.get('COMPRESS_MIN_SIZE', 1024)
+    level = app.config.get('COMPRESS_LEVEL', 6)
+
+    @app.after_request
+    def compress_response(response):
+        if (response.status_code != 200
+                or response.direct_passthrough
+                or response.is_streamed
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES
+                or 'gzip' not in request.headers.get('Accept-Encoding', '').lower()):
+            return response
+
+        data = response.get_data()
+
+        if len(data) < min_size:
+            return response
+
+        response.set_data(gzip.compress(data, compresslevel=level))
+        response.headers['Content-Encoding'] = 'gzip'
+        response.vary.add('Accept-Encoding')
+
+        return response
@@ -0,0 +1,184 @@
+import hashlib
+import secrets
+import threading
+
+from datetime import datetime, timezone
+
+# Flask related
+from flask.sessions import SecureCookieSession, SessionInterface, session_json_serializer
+
+from database.db import db
+from database.models.session import UserSession
+
+from sqlalchemy import delete, insert, select, update
+
+# Expiry is only pushed forward once less than this share of the lifetime is left, not on every request.
+REFRESH_FRACTION = 0.5
+
+
+def _now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _key(sid):
+    return hashlib.sha256(sid.encode()).hexdigest()
+
+
+class ServerSession(SecureCookieSession):
+    def __init__(self, initial=None, sid=None, expires=None):
+        super().__init__(initial)
+        self.sid = sid
+        self.expires = expires
+        self.loaded_user_id = self.get('_user_id') if initial else None
+
+
+# Rows in user_session. Always the primary engine and its own transaction, so sessions never go through
+# the replica router and never commit (or roll back) the request's ORM session.
+class DatabaseStore:
+    def load(self, key):
+        with db.engine.connect() as conn:
+            row = conn.execute(
+                select(UserSession.data, UserSession.expires).where(UserSession.id == key)
+            ).first()
+
+        if row is None or row.expires <= _now():
+            return None
+
+        return session_json_serializer.loads(row.data), row.expires
+
+    def save(self, key, user_id, data, expires, new):
+        values = {'user_id': user_id, 'data': session_json_serializer.dumps(data), 'expires': expires}
+
+        with db.engine.begin() as conn:
+            if new or not conn.execute(update(UserSession).where(UserSession.id == key).values(**values)).rowcount:
+                conn.execute(insert(UserSession).values(id=key, **values))
+
+    def delete(self, key):
+        with db.engine.begin() as conn:
+            conn.execute(delete(UserSession).where(UserSession.id == key))
+
+    def revoke_user(self, user_id):
+        with db.engine.begin() as conn:
+            return conn.execute(delete(UserSession).where(UserSession.user_id == user_id)).rowcount
+
+    def purge(self):
+        with db.engine.begin() as conn:
+            return conn.execute(delete(UserSession).where(UserSession.expires <= _now())).rowcount
+
+
+# Single process only (development, tests); every worker would have its own sessions.
+class MemoryStore:
+    def __init__(self):
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def load(self, key):
+        with self._lock:
+            entry = self._sessions.get(key)
+
+        if entry is None or entry[2] <= _now():
+            return None
+
+        return dict(entry[1]), entry[2]
+
+    def save(self, key, user_id, data, expires, new):
+        with self._lock:
+            self._sessions[key] = (user_id, dict(data), expires)
+
+    def delete(self, key):
+        with self._lock:
+            self._sessions.pop(key, None)
+
+    def revoke_user(self, user_id):
+        with self._lock:
+            keys = [key for key, entry in self._sessions.items() if entry[0] == user_id]
+            for key in keys:
+                del self._sessions[key]
+
+        return len(keys)
+
+    def purge(self):
+        now = _now()
+
+        with self._lock:
+            keys = [key for key, entry in self._sessions.items() if entry[2] <= now]
+            for key in keys:
+                del self._sessions[key]
+
+        return len(keys)
+
+
+STORES = {'database': DatabaseStore, 'memory': MemoryStore}
+
+
+# The cookie only carries a random session id; the data lives in the store, so deleting it there
+# logs the browser out immediately.
+class ServerSessionInterface(SessionInterface):
+    def __init__(self, store):
+        self.store = store
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+
+        if sid:
+            loaded = self.store.load(_key(sid))
+            if loaded is not None:
+                return ServerSession(loaded[0], sid=sid, expires=loaded[1])
+
+        return ServerSession()
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if session.accessed:
+            response.vary.add('Cookie')
+
+        if not session:
+            if session.sid is not None:
+                self.store.delete(_key(session.sid))
+                response.delete_cookie(name, domain=domain, path=path,
+                                       secure=self.get_cookie_secure(app), httponly=self.get_cookie_httponly(app))
+            return
+
+        lifetime = app.permanent_session_lifetime
+        refresh = session.expires is not None and session.expires - _now() < lifetime * REFRESH_FRACTION
+
+        if not session.modified and not refresh:
+            return
+
+        user_id = session.get('_user_id')
+
+        # A new id whenever the user changes (login, logout), an id seen before logging in is worthless.
+        if session.sid is not None and user_id != session.loaded_user_id:
+            self.store.delete(_key(session.sid))
+            session.sid = None
+
+        new = session.sid is None
+        if new:
+            session.sid = secrets.token_urlsafe(32)
+
+        self.store.save(_key(session.sid), int(user_id) if user_id else None, dict(session), _now() + lifetime, new)
+
+        response.set_cookie(name, session.sid,
+                            expires=self.get_expiration_time(app, session),
+                            httponly=self.get_cookie_httponly(app),
+                            domain=domain, path=path,
+                            secure=self.get_cookie_secure(app),
+                            samesite=self.get_cookie_samesite(app))
+
+
+# Logs the user out everywhere, returns how many sessions were removed (always 0 for cookie sessions).
+def revoke_user_sessions(app, user_id):
+    store = getattr(app.session_interface, 'store', None)
+    return store.revoke_user(user_id) if store else 0
+
+
+def init_sessions(app):
+    backend = app.config.get('SESSION_BACKEND', 'database')
+
+    if backend == 'cookie':
+        return
+
+    app.session_interface = ServerSessionInterface(STORES[backend]())
@@ -0,0 +1,33 @@
+import pytest
+
+from main import create_app
+from permissions import invalidate_permissions
+from bench.seed import ADMIN_EMAIL, BENCH_PASSWORD
+
+
+# create_app(**config) on a fresh SQLite file per test. The role -> permission map is module level,
+# it must not leak from one test database into the next.
+@pytest.fixture
+def make_app(tmp_path):
+    def make(**config):
+        invalidate_permissions()
+
+        return create_app({
+            'SECRET_KEY': 'test',
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "primary.db"}',
+            'METRICS_ENABLED': False,
+            **config,
+        })
+
+    return make
+
+
+# login(client) signs the client in, as the seeded admin by default.
+@pytest.fixture
+def login():
+    def sign_in(client, email=ADMIN_EMAIL, password=BENCH_PASSWORD):
+        response = client.post('/login', data={'email': email, 'password': password})
+        assert response.status_code == 302
+        return client
+
+    return sign_in
@@ -0,0 +1,162 @@
+import csv
+import io
+import json
+
+from datetime import date, datetime
+
+import pytest
+
+from sqlalchemy import func, select, update
+
+from database.archive import archive_old_rows
+from database.db import db
+from database.models.archive import event_archive, invoice_item_archive, invoices_archive, notification_archive
+from database.models.events import Event
+from database.models.invoices import InvoiceItem, Invoices
+from database.models.notification import Notification
+from bench.seed import seed_data
+
+# Cutoffs: invoices and events before 2025-01-01, notifications before 2025-10-03.
+TODAY = date(2026, 1, 1)
+
+
+# One user with three invoices of two items each: 1 is paid and old (archived), 2 is old but still
+# requested, 3 is paid but recent. Three past single-day events in 2024 plus an open weekly series,
+# and two notifications of which the first is old.
+@pytest.fixture
+def app(make_app):
+    app = make_app()
+
+    with app.app_context():
+        seed_data(users=1, invoices_per_user=3, items_per_invoice=2, todos_per_user=0,
+                  events_per_user=3, availability_per_user=0, notifications_per_user=2)
+
+        for invoice_id, status, created in ((1, 'paid', '2024-03-01'), (2, 'requested', '2024-03-01'),
+                                            (3, 'paid', '2025-06-01')):
+            db.session.execute(update(Invoices).where(Invoices.id == invoice_id)
+                               .values(status=status, date_created=created))
+
+        db.session.execute(update(Notification).where(Notification.id == 1)
+                           .values(created_at=datetime(2024, 1, 1)))
+        db.session.commit()
+
+    return app
+
+
+@pytest.fixture
+def archived(app):
+    with app.app_context():
+        report = archive_old_rows(today=TODAY, vacuum=False)
+
+    return report
+
+
+def count(table):
+    return db.session.scalar(select(func.count()).select_from(table))
+
+
+def test_moves_rows_into_archive_tables(app, archived):
+    assert archived.moved == {'invoices': 1, 'invoice_items': 2, 'notifications': 1, 'events': 3}
+
+    with app.app_context():
+        assert db.session.scalars(select(Invoices.id).order_by(Invoices.id)).all() == [2, 3]
+        assert db.session.scalars(select(invoices_archive.c.id)).all() == [1]
+
+        assert db.session.scalar(select(func.count()).where(InvoiceItem.invoice_id == 1)) == 0
+        items = db.session.execute(select(invoice_item_archive.c.invoice_id, invoice_item_archive.c.archived_at)).all()
+        archived_at = db.session.scalar(select(invoices_archive.c.archived_at))
+        assert items == [(1, archived_at), (1, archived_at)]
+
+        assert db.session.scalars(select(Event.title)).all() == ['Standup']
+        assert count(event_archive) == 3
+
+        assert db.session.scalars(select(Notification.id)).all() == [2]
+        assert db.session.scalars(select(notification_archive.c.id)).all() == [1]
+
+
+def test_archive_is_idempotent(app, archived):
+    with app.app_context():
+        again = archive_old_rows(today=TODAY, vacuum=False)
+
+    assert again.moved == {'invoices': 0, 'invoice_items': 0, 'notifications': 0, 'events': 0}
+
+
+def test_small_batches_move_everything(app):
+    with app.app_context():
+        report = archive_old_rows(today=TODAY, vacuum=False, batch_size=1)
+
+        assert report.moved == {'invoices': 1, 'invoice_items': 2, 'notifications': 1, 'events': 3}
+        assert count(event_archive) == 3
+
+
+def test_invoice_listing(app, archived, login):
+    client = login(app.test_client())
+
+    live = client.get('/invoices/filter?status=paid').get_json()
+    assert [invoice['id'] for invoice in live] == [3]
+
+    listing = client.get('/invoices/filter?status=paid&archived=1').get_json()
+    assert sorted((invoice['id'], invoice['archived']) for invoice in listing) == [(1, True), (3, False)]
+
+
+def test_invoice_items(app, archived, login):
+    client = login(app.test_client())
+
+    assert client.get('/invoices/1/items').status_code == 404
+
+    response = client.get('/invoices/1/items?archived=1')
+    assert response.status_code == 200
+    assert len(response.get_json()['items']) == 2
+
+
+def test_events(app, archived, login):
+    client = login(app.test_client())
+    query = '/events/get?start=2024-01-01&end=2024-12-31'
+
+    live = client.get(query).get_json()
+    assert {event['title'] for event in live} == {'Standup'}
+
+    events = client.get(query + '&archived=1').get_json()
+    past = [event for event in events if event['title'] != 'Standup']
+    assert len(past) == 3
+    assert all(event['archived'] for event in past)
+
+
+def test_notifications(app, archived, login):
+    client = login(app.test_client())
+
+    assert [n['id'] for n in client.get('/notifications').get_json()] == [2]
+
+    listing = client.get('/notifications?archived=1').get_json()
+    assert [(n['id'], n['archived']) for n in listing] == [(2, False), (1, True)]
+
+
+def test_invoice_export(app, archived, login):
+    client = login(app.test_client())
+
+    live = [json.loads(line) for line in client.get('/export/invoices.ndjson').get_data(as_text=True).splitlines()]
+    assert [record['id'] for record in live] == [2, 3]
+
+    records = [json.loads(line)
+               for line in client.get('/export/invoices.ndjson?archived=1').get_data(as_text=True).splitlines()]
+    by_id = {record['id']: record for record in records}
+
+    assert sorted(by_id) == [1, 2, 3]
+    assert by_id[1]['archived_at'] is not None
+    assert len(by_id[1]['items']) == 2
+    assert by_id[2]['archived_at'] is None
+
+    rows = list(csv.DictReader(io.StringIO(client.get('/export/invoices.csv?archived=1').get_data(as_text=True))))
+    assert len(rows) == 6
+    assert sum(1 for row in rows if row['archived_at']) == 2
+
+
+def test_event_export(app, archived, login):
+    client = login(app.test_client())
+
+    live = list(csv.DictReader(io.StringIO(client.get('/export/events.csv').get_data(as_text=True))))
+    assert [row['title'] for row in live] == ['Standup']
+
+    rows = list(csv.DictReader(io.StringIO(client.get('/export/events.csv?archived=1').get_data(as_text=True))))
+    assert len(rows) == 4
+    assert sum(1 for row in rows if row['archived_at']) == 3
@@ -0,0 +1,136 @@
+from datetime import datetime
+
+import pytest
+
+from database.db import db
+from database.models.roles import Roles
+from database.models.session import UserSession
+from database.models.user import User
+from bench.seed import seed_data
+
+USER_EMAIL = 'user1@bench.local'
+
+
+@pytest.fixture(params=['database', 'memory'])
+def app(request, make_app):
+    app = make_app(SESSION_BACKEND=request.param, FRAGMENT_CACHE_ENABLED=False)
+
+    with app.app_context():
+        seed_data(users=2, invoices_per_user=1, items_per_invoice=1)
+        # Seeded roles are random, this one is a plain user.
+        db.session.execute(db.update(User).where(User.email == USER_EMAIL).values(role='user'))
+        db.session.commit()
+
+    return app
+
+
+def _logged_out(response):
+    return response.status_code == 302 and '/login' in response.headers['Location']
+
+
+def test_logout_all_ends_every_session(app, login):
+    laptop = login(app.test_client(), USER_EMAIL)
+    phone = login(app.test_client(), USER_EMAIL)
+    admin = login(app.test_client())
+
+    assert phone.get('/team').status_code == 200
+    assert _logged_out(laptop.post('/logout-all'))
+
+    assert _logged_out(phone.get('/team'))
+    assert _logged_out(laptop.get('/team'))
+    assert admin.get('/team').status_code == 200
+
+
+def test_password_change_ends_sessions(app, login):
+    user = login(app.test_client(), USER_EMAIL)
+    admin = login(app.test_client())
+
+    with app.app_context():
+        target = User.query.filter_by(email=USER_EMAIL).one()
+        form = {'email': target.email, 'name': target.name, 'role': target.role, 'user_id': target.id,
+                'action': 'edit', 'new_password': 'another-password'}
+
+    assert admin.post('/edit-user', data=form).json['success']
+    assert _logged_out(user.get('/team'))
+    login(app.test_client(), USER_EMAIL, 'another-password')
+
+
+def test_login_rotates_the_session_id(app, login):
+    client = app.test_client()
+    client.get('/login')
+    client.set_cookie('session', 'chosen-by-attacker')
+
+    login(client, USER_EMAIL)
+    assert client.get_cookie('session').value != 'chosen-by-attacker'
+
+
+def test_expired_session_is_logged_out(make_app, login):
+    app = make_app()
+
+    with app.app_context():
+        seed_data(users=1, invoices_per_user=0, items_per_invoice=0)
+
+    client = login(app.test_client())
+
+    with app.app_context():
+        db.session.execute(db.update(UserSession).values(expires=datetime(2000, 1, 1)))
+        db.session.commit()
+
+    assert _logged_out(client.get('/team'))
+
+    result = app.test_cli_runner().invoke(args=['admin', 'purge-sessions'])
+    assert 'Removed 1 expired sessions' in result.output
+
+
+def test_protected_routes(app, login):
+    anonymous = app.test_client()
+    user = login(app.test_client(), USER_EMAIL)
+    admin = login(app.test_client())
+
+    assert _logged_out(anonymous.get('/admin'))
+    assert _logged_out(anonymous.post('/invoices/update_status/bulk', json={}))
+
+    # Pages redirect to the team page, everything else is a 403.
+    assert user.get('/admin').headers['Location'].endswith('/team')
+    for url in ('/invoices/update_status/bulk', '/admin/backup', '/add-role', '/role-permissions', '/user-add'):
+        response = user.post(url, json={})
+        assert response.status_code == 403, url
+        assert response.json['message'] == 'Forbidden'
+
+    assert admin.get('/admin').status_code == 200
+
+
+def test_custom_role_gains_and_loses_permissions(app, login):
+    admin = login(app.test_client())
+    assert admin.post('/add-role', data={'role_name': 'auditor', 'permissions': ['view_all']}).status_code == 201
+
+    with app.app_context():
+        role_id = Roles.query.filter_by(name='auditor').one().id
+        db.session.execute(db.update(User).where(User.email == USER_EMAIL).values(role='auditor'))
+        db.session.commit()
+
+    user = login(app.test_client(), USER_EMAIL)
+    assert user.get('/admin').status_code == 302
+    assert user.post('/invoices/update_status/bulk', json={}).status_code == 403
+
+    admin.post('/role-permissions', data={'role_id': role_id, 'permissions': ['admin_panel', 'manage_invoices']})
+    assert user.get('/admin').status_code == 200
+    assert user.post('/invoices/update_status/bulk', json={}).status_code == 400
+
+    admin.post('/role-permissions', data={'role_id': role_id})
+    assert user.get('/admin').status_code == 302
+    assert user.post('/invoices/update_status/bulk', json={}).status_code == 403
+
+    with app.app_context():
+        assert db.session.get(Roles, role_id).permissions == ''
+
+
+def test_admin_role_permissions_are_fixed(app, login):
+    admin = login(app.test_client())
+
+    with app.app_context():
+        role_id = Roles.query.filter_by(name='admin').one().id
+
+    admin.post('/role-permissions', data={'role_id': role_id})
+    assert admin.get('/admin').status_code == 200
+
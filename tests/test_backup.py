@@ -0,0 +1,163 @@
+import gzip
+import os
+import sqlite3
+
+import pytest
+
+from sqlalchemy import func, select
+
+from database.backup import backup_database, list_backups, restore_backup, rotate_backups, verify_backup
+from database.db import db
+from database.models.invoices import InvoiceItem, Invoices
+from database.models.user import User
+from bench.seed import seed_data
+
+
+@pytest.fixture
+def app(make_app):
+    app = make_app()
+
+    with app.app_context():
+        seed_data(users=3, invoices_per_user=4, items_per_invoice=2, todos_per_user=1,
+                  events_per_user=2, availability_per_user=1, notifications_per_user=1)
+
+    return app
+
+
+def table_counts(path):
+    conn = sqlite3.connect(path)
+
+    try:
+        tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        return {table: conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0] for table in tables}
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize('compress', [True, False])
+def test_backup_verify_restore_round_trip(app, tmp_path, compress):
+    source = str(tmp_path / 'primary.db')
+
+    with app.app_context():
+        report = backup_database(str(tmp_path / 'backups'), compress=compress)
+
+    assert report.path.endswith('.db.gz' if compress else '.db')
+    assert os.path.getsize(report.path) == report.compressed_bytes
+    assert report.pages > 0
+    assert not [name for name in os.listdir(tmp_path / 'backups') if not name.startswith('primary-')]
+
+    result = verify_backup(report.path)
+    assert result['ok'] and result['errors'] == []
+    assert result['tables'] == table_counts(source)
+    assert result['tables']['invoices'] == 12
+
+    target = str(tmp_path / 'restored.db')
+    restored = restore_backup(report.path, target)
+
+    assert restored['tables'] == table_counts(source)
+    assert table_counts(target) == table_counts(source)
+
+
+def test_restore_replaces_an_existing_database(app, tmp_path):
+    with app.app_context():
+        report = backup_database(str(tmp_path / 'backups'))
+
+        db.session.execute(InvoiceItem.__table__.delete())
+        db.session.execute(Invoices.__table__.delete())
+        db.session.commit()
+        assert db.session.scalar(select(func.count(Invoices.id))) == 0
+
+    restore_backup(report.path, str(tmp_path / 'primary.db'))
+
+    with app.app_context():
+        db.session.close()
+        assert db.session.scalar(select(func.count(Invoices.id))) == 12
+
+
+def test_backup_sees_committed_writes(app, tmp_path):
+    with app.app_context():
+        first = backup_database(str(tmp_path / 'backups'))
+        db.session.add(User(email='late@bench.local', password='x', role='user', name='late'))
+        db.session.commit()
+        second = backup_database(str(tmp_path / 'backups'))
+
+    assert verify_backup(first.path)['tables']['user'] == 3
+    assert verify_backup(second.path)['tables']['user'] == 4
+
+
+@pytest.mark.parametrize('content', [b'not a backup', gzip.compress(b'not a database' * 100)])
+def test_corrupt_backups_are_rejected(tmp_path, content):
+    path = tmp_path / 'primary-20240101-000000-000000.db.gz'
+    path.write_bytes(content)
+
+    result = verify_backup(str(path))
+    assert not result['ok']
+    assert result['errors']
+
+    target = tmp_path / 'restored.db'
+    with pytest.raises(ValueError):
+        restore_backup(str(path), str(target))
+
+    assert not target.exists() or target.stat().st_size == 0
+
+
+def test_truncated_backup_fails_verification(app, tmp_path):
+    with app.app_context():
+        report = backup_database(str(tmp_path / 'backups'))
+
+    with open(report.path, 'rb') as f:
+        data = f.read()
+    with open(report.path, 'wb') as f:
+        f.write(data[:len(data) // 2])
+
+    assert not verify_backup(report.path)['ok']
+
+
+def test_rotation_keeps_newest(app, tmp_path):
+    directory = str(tmp_path / 'backups')
+    reports = []
+
+    with app.app_context():
+        for _ in range(4):
+            reports.append(backup_database(directory, keep=2))
+
+    kept = list_backups(directory, 'primary-')
+    assert kept == [reports[2].path, reports[3].path]
+    assert reports[2].removed == [reports[0].path]
+    assert reports[3].removed == [reports[1].path]
+
+
+def test_rotation_ignores_other_files(tmp_path):
+    for name in ('primary-20240101-000000-000000.db', 'primary-20240102-000000-000000.db.gz',
+                 'primary-20240103-000000-000000.db.gz', 'other-20240101-000000-000000.db', 'notes.txt'):
+        (tmp_path / name).write_bytes(b'')
+
+    removed = rotate_backups(str(tmp_path), 'primary-', keep=1)
+
+    assert [os.path.basename(path) for path in removed] == ['primary-20240101-000000-000000.db',
+                                                             'primary-20240102-000000-000000.db.gz']
+    assert sorted(os.listdir(tmp_path)) == ['notes.txt', 'other-20240101-000000-000000.db',
+                                            'primary-20240103-000000-000000.db.gz']
+
+    # keep=0 turns rotation off.
+    assert rotate_backups(str(tmp_path), 'other-', keep=0) == []
+
+
+def test_backup_commands(app, tmp_path):
+    runner = app.test_cli_runner()
+    directory = tmp_path / 'backups'
+
+    result = runner.invoke(args=['admin', 'backup', '--dir', str(directory), '--keep', '1', '--verify'])
+    assert result.exit_code == 0, result.output
+    path, = list_backups(str(directory), 'primary-')
+
+    assert runner.invoke(args=['admin', 'verify-backup', path]).exit_code == 0
+
+    target = tmp_path / 'restored.db'
+    assert runner.invoke(args=['admin', 'restore-backup', path, str(target)]).exit_code == 0
+    assert table_counts(str(target)) == table_counts(str(tmp_path / 'primary.db'))
+
+    result = runner.invoke(args=['admin', 'restore-backup', path, str(target)])
+    assert result.exit_code != 0
+    assert '--force' in result.output
+    assert runner.invoke(args=['admin', 'restore-backup', path, str(target), '--force']).exit_code == 0
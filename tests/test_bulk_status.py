@@ -0,0 +1,80 @@
+from decimal import Decimal
+
+import pytest
+
+from database.db import db
+from database.models.invoices import Invoices
+from database.models.notification import Notification
+from database.models.user import User
+from bench.seed import seed_data
+
+URL = '/invoices/update_status/bulk'
+
+
+@pytest.fixture
+def app(make_app):
+    app = make_app()
+
+    with app.app_context():
+        seed_data(users=3, invoices_per_user=3, items_per_invoice=2, notifications_per_user=0)
+        db.session.execute(db.update(Invoices).values(status='requested'))
+        db.session.execute(db.update(User).values(revenue=0))
+        db.session.commit()
+
+    return app
+
+
+def _state(app, user_id):
+    with app.app_context():
+        revenue = db.session.get(User, user_id).revenue
+        notifications = db.session.scalar(
+            db.select(db.func.count()).select_from(Notification).where(Notification.user_id == user_id))
+        invoices = db.session.execute(
+            db.select(Invoices.id, Invoices.total).where(Invoices.user_id == user_id).order_by(Invoices.id)).all()
+
+    return revenue, notifications, invoices
+
+
+def test_results_revenue_and_notifications(app, login):
+    client = login(app.test_client())
+    _, _, invoices = _state(app, 2)
+    (first, first_total), (second, second_total), _ = invoices
+
+    assert client.post(URL, json={'invoice_ids': [second], 'status': 'paid'}).json['results'] == {str(second): 'updated'}
+    assert _state(app, 2)[:2] == (second_total, 1)
+
+    response = client.post(URL, json={'invoice_ids': [first, second, 999999, first], 'status': 'paid'})
+    assert response.json['results'] == {str(first): 'updated', str(second): 'unchanged', '999999': 'not_found'}
+
+    # Only the newly paid invoice adds to revenue and notifies.
+    revenue, notifications, _ = _state(app, 2)
+    assert revenue == first_total + second_total
+    assert isinstance(revenue, Decimal)
+    assert notifications == 2
+
+    response = client.post(URL, json={'invoice_ids': [first, second], 'status': 'paid'})
+    assert set(response.json['results'].values()) == {'unchanged'}
+    assert _state(app, 2)[:2] == (revenue, 2)
+
+    # Leaving 'paid' doesn't touch revenue.
+    client.post(URL, json={'invoice_ids': [first], 'status': 'declined'})
+    assert _state(app, 2)[:2] == (revenue, 3)
+
+
+def test_revenue_spans_users(app, login):
+    client = login(app.test_client())
+    ids, expected = [], {}
+
+    for user_id in (1, 2, 3):
+        _, _, invoices = _state(app, user_id)
+        ids += [invoice_id for invoice_id, _ in invoices[:2]]
+        expected[user_id] = sum(total for _, total in invoices[:2])
+
+    assert client.post(URL, json={'invoice_ids': ids, 'status': 'paid'}).status_code == 200
+    assert {user_id: _state(app, user_id)[0] for user_id in expected} == expected
+
+
+@pytest.mark.parametrize('body', [[1, 2], 'paid', {'invoice_ids': [1]}, {'invoice_ids': [], 'status': 'paid'},
+                                  {'invoice_ids': ['x'], 'status': 'paid'}, {'invoice_ids': 1, 'status': 'paid'}])
+def test_bad_requests(app, login, body):
+    assert login(app.test_client()).post(URL, json=body).status_code == 400
@@ -0,0 +1,58 @@
+from database.db import db
+from database.models.user import User
+from bench.seed import seed_data
+
+
+def _add_user(admin, email):
+    assert admin.post('/user-add', data={'email': email, 'password': 'secret', 'role': 'user'}).status_code == 201
+
+    return db.session.execute(db.select(User.id, User.name, User.calendar_version).where(User.email == email)).one()
+
+
+def _feed_urls(app, login, email, events=()):
+    client = login(app.test_client(), email, 'secret')
+
+    if events:
+        response = client.post('/events/save', json={'events': [{'title': title, 'start': day} for title, day in events]})
+        assert response.status_code == 200
+
+    urls = client.post('/calendar/feed-token').json
+    return urls['user_feed'], urls['team_feed']
+
+
+# SQLite gives a new row the id of the deleted last one. Its feeds must not serve the old user's events.
+def test_feed_cache_survives_user_id_reuse(make_app, login):
+    app = make_app(FRAGMENT_CACHE_ENABLED=False)
+
+    with app.app_context():
+        seed_data(users=2, invoices_per_user=1, items_per_invoice=1, events_per_user=0, availability_per_user=0)
+
+    admin = login(app.test_client())
+
+    with app.app_context():
+        old = _add_user(admin, 'old@example.com')
+
+    old_feed, team_feed = _feed_urls(app, login, 'old@example.com', [('old-private-event', '2026-01-05')])
+    reader = app.test_client()
+
+    assert 'old-private-event' in reader.get(old_feed).get_data(as_text=True)
+    team = reader.get(team_feed)
+    assert 'old-private-event' in team.get_data(as_text=True)
+
+    response = admin.post('/edit-user', data={'email': 'old@example.com', 'name': old.name, 'role': 'user',
+                                              'user_id': old.id, 'action': 'delete'})
+    assert response.json['success']
+
+    with app.app_context():
+        new = _add_user(admin, 'new@example.com')
+
+    assert new.id == old.id
+    assert new.calendar_version != old.calendar_version
+
+    new_feed, new_team_feed = _feed_urls(app, login, 'new@example.com')
+    assert 'old-private-event' not in reader.get(new_feed).get_data(as_text=True)
+
+    # A client still holding the old team ETag gets the new body, not a 304.
+    response = reader.get(new_team_feed, headers={'If-None-Match': team.headers['ETag']})
+    assert response.status_code == 200
+    assert 'old-private-event' not in response.get_data(as_text=True)
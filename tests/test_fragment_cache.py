@@ -0,0 +1,181 @@
+import pytest
+
+from sqlalchemy import select
+
+from database.db import db
+from database.models.invoices import Invoices
+from database.models.roles import Roles
+from database.models.user import User
+from bench.seed import seed_data
+
+
+# Cached fragments are only correct if every write moves a value in their key, so each test warms the
+# cache with a page view, writes through a route and expects the next view to show the change.
+@pytest.fixture
+def app(make_app):
+    app = make_app(FRAGMENT_CACHE_ENABLED=True)
+
+    with app.app_context():
+        seed_data(users=3, invoices_per_user=1, items_per_invoice=1, todos_per_user=0,
+                  events_per_user=0, availability_per_user=0, notifications_per_user=0)
+        db.session.get(User, 2).role = 'manager'
+        db.session.get(User, 3).role = 'user'
+        db.session.execute(Invoices.__table__.update().values(status='requested'))
+        db.session.commit()
+
+    return app
+
+
+@pytest.fixture
+def client(app, login):
+    return login(app.test_client())
+
+
+def page(client, path):
+    response = client.get(path)
+    assert response.status_code == 200
+    return response.get_data(as_text=True)
+
+
+def role_form(html, role_id):
+    start = html.index(f'<input type="hidden" name="role_id" value="{role_id}">')
+    return html[start:html.index('</form>', start)]
+
+
+def test_cache_serves_repeated_views(app, client):
+    assert page(client, '/admin') == page(client, '/admin')
+    assert len(app.jinja_env.fragment_cache._data) > 0
+
+
+def test_profile_edit(client):
+    page(client, '/team')
+    page(client, '/admin')
+
+    response = client.post('/edit-profile', data={'name': 'renamed-admin', 'bio': 'New bio text',
+                                                   'email': 'admin@bench.local'})
+    assert response.status_code == 302
+
+    for path in ('/team', '/admin'):
+        html = page(client, path)
+        assert 'renamed-admin' in html
+        assert 'bench-admin' not in html
+
+    assert 'New bio text' in page(client, '/team')
+
+
+def test_delete_avatar(app, client):
+    with app.app_context():
+        db.session.get(User, 1).profile_img = 'images/custom.png'
+        db.session.commit()
+
+    assert 'images/custom.png' in page(client, '/team')
+
+    client.post('/delete-avatar')
+
+    assert 'images/custom.png' not in page(client, '/team')
+
+
+def test_edit_user(client):
+    page(client, '/team')
+    page(client, '/admin')
+
+    response = client.post('/edit-user', data={'user_id': 3, 'email': 'user2@bench.local',
+                                               'name': 'promoted', 'role': 'manager'})
+    assert response.status_code == 201
+
+    for path in ('/team', '/admin'):
+        html = page(client, path)
+        assert 'promoted' in html
+        assert 'bench-2' not in html
+
+
+def test_add_and_remove_role(app, client):
+    assert 'Auditor' not in page(client, '/admin')
+
+    response = client.post('/add-role', data={'role_name': 'auditor'})
+    assert response.status_code == 201
+    assert 'Auditor' in page(client, '/admin')
+
+    with app.app_context():
+        role_id = db.session.scalar(select(Roles.id).where(Roles.name == 'auditor'))
+        db.session.get(User, 3).role = 'auditor'
+        db.session.get(User, 3).touch_profile()
+        db.session.commit()
+
+    assert 'Auditor' in page(client, '/team')
+
+    client.post('/remove-role', data={'role_id': role_id})
+
+    assert 'Auditor' not in page(client, '/admin')
+    assert 'Auditor' not in page(client, '/team')
+
+
+def test_permission_change(app, client):
+    client.post('/add-role', data={'role_name': 'auditor'})
+
+    with app.app_context():
+        role_id = db.session.scalar(select(Roles.id).where(Roles.name == 'auditor'))
+
+    assert role_form(page(client, '/admin'), role_id).count('checked') == 0
+
+    client.post('/role-permissions', data={'role_id': role_id, 'permissions': ['view_all', 'manage_invoices']})
+    assert role_form(page(client, '/admin'), role_id).count('checked') == 2
+
+    client.post('/role-permissions', data={'role_id': role_id, 'permissions': ['view_all']})
+    assert role_form(page(client, '/admin'), role_id).count('checked') == 1
+
+
+def test_set_note(client):
+    page(client, '/admin')
+
+    client.post('/set-note', data={'invoice_id': 1, 'note': 'Fresh note'})
+
+    assert 'data-note="Fresh note"' in page(client, '/admin')
+
+
+def test_update_status(client):
+    assert 'data-status="paid"' not in page(client, '/admin')
+
+    response = client.post('/invoices/update_status?invoice_id=1&status=paid')
+    assert response.status_code == 200
+
+    assert page(client, '/admin').count('data-status="paid"') == 1
+
+
+def test_bulk_update_status(client):
+    page(client, '/admin')
+
+    response = client.post('/invoices/update_status/bulk', json={'invoice_ids': [1, 2, 3], 'status': 'declined'})
+    assert response.status_code == 200
+
+    html = page(client, '/admin')
+    assert html.count('data-status="declined"') == 3
+    assert 'data-status="requested"' not in html
+
+
+def test_invoice_upload_and_delete(app, client):
+    page(client, '/admin')
+
+    client.post('/invoice-upload', data={
+        'title': 'Brand new', 'date': '2024-05-01', 'from': '1 Test Street',
+        'item_name[]': ['Thing'], 'item_price[]': ['12.50'], 'item_qty[]': ['2'],
+    })
+
+    html = page(client, '/admin')
+    assert 'data-name="Brand new"' in html
+    assert 'data-total="25.00"' in html
+
+    with app.app_context():
+        invoice_id = db.session.scalar(select(Invoices.id).where(Invoices.title == 'Brand new'))
+
+    client.post('/remove-invoice', data={'invoice_id': invoice_id})
+
+    assert 'Brand new' not in page(client, '/admin')
+
+
+def test_sidebar_notifications(client):
+    assert 'invoice note updated.' not in page(client, '/team')
+
+    client.post('/set-note', data={'invoice_id': 1, 'note': 'Ping'})
+
+    assert 'invoice note updated.' in page(client, '/team')
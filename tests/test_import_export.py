@@ -0,0 +1,90 @@
+import io
+import json
+
+import pytest
+
+from database.db import db
+from database.importer import validate_invoice
+from database.models.invoices import InvoiceItem, Invoices
+from bench.seed import seed_data
+
+TITLE = 'A & B <Ltd>'
+ITEM = 'Fish & "Chips"'
+
+
+@pytest.fixture
+def app(make_app):
+    app = make_app()
+
+    with app.app_context():
+        seed_data(users=2, invoices_per_user=0, items_per_invoice=0)
+
+    return app
+
+
+def _stored(app):
+    with app.app_context():
+        return db.session.execute(
+            db.select(Invoices.title, InvoiceItem.name, InvoiceItem.price, InvoiceItem.quantity)
+            .join(InvoiceItem, InvoiceItem.invoice_id == Invoices.id)
+            .order_by(Invoices.id, InvoiceItem.id)
+        ).all()
+
+
+@pytest.mark.parametrize('fmt', ['csv', 'ndjson'])
+def test_export_imports_back_unchanged(app, login, fmt):
+    client = login(app.test_client())
+    client.post('/invoice-upload', data={'title': TITLE, 'date': '2026-01-05', 'from': '1 Street',
+                                         'item_name[]': [ITEM, 'Plain'], 'item_price[]': ['2.50', '1'],
+                                         'item_qty[]': ['3', '1']})
+    original = _stored(app)
+
+    exported = client.get(f'/export/invoices.{fmt}').get_data(as_text=True)
+    if fmt == 'ndjson':
+        assert json.loads(exported)['title'] == TITLE
+    else:
+        assert TITLE in exported
+
+    response = client.post('/invoices/import', data={'file': (io.BytesIO(exported.encode()), f'invoices.{fmt}')},
+                           content_type='multipart/form-data')
+    assert response.json['imported'] == 1 and response.json['error_count'] == 0
+
+    assert _stored(app) == original * 2
+
+
+def test_cli_reports_unreadable_json(app, tmp_path):
+    path = tmp_path / 'broken.json'
+    path.write_text('[{"title": ')
+
+    result = app.test_cli_runner().invoke(args=['invoices', 'import', str(path)])
+
+    assert result.exit_code == 1
+    assert 'Could not read' in result.output
+
+
+VALID = {'user_id': 1, 'title': 't', 'date_created': '2026-01-01', 'from_address': 'a',
+         'items': [{'name': 'x', 'price': '1.50', 'quantity': 2}]}
+
+
+@pytest.mark.parametrize('changes', [
+    {'title': 5},
+    {'note': 5},
+    {'status': 5},
+    {'user_id': True},
+    {'items': 'abc'},
+    {'items': ['abc']},
+    {'items': [{'name': 'x', 'price': 'NaN', 'quantity': 1}]},
+    {'items': [{'name': 'x', 'price': 'Infinity', 'quantity': 1}]},
+    {'items': [{'name': 'x', 'price': '1e400', 'quantity': 1}]},
+    {'items': [{'name': 'x', 'price': {'a': 1}, 'quantity': 1}]},
+    {'items': [{'name': 'x', 'price': '-1', 'quantity': 1}]},
+])
+def test_malformed_rows_are_errors(changes):
+    parsed, error = validate_invoice(dict(VALID, **changes), {1})
+    assert parsed is None and error
+
+
+def test_valid_row():
+    (invoice, items), error = validate_invoice(VALID, {1})
+    assert error is None
+    assert str(invoice['total']) == '3.00' and invoice['status'] == 'requested'
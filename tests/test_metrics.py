@@ -0,0 +1,64 @@
+import pytest
+
+from database.db import db
+from database.models.user import User
+from bench.seed import seed_data
+
+TOKEN = 'scrape-token'
+
+
+@pytest.fixture
+def app(make_app):
+    app = make_app(METRICS_ENABLED=True, METRICS_TOKEN=TOKEN)
+
+    with app.app_context():
+        seed_data(users=2, invoices_per_user=0, items_per_invoice=0, todos_per_user=0,
+                  events_per_user=0, availability_per_user=0, notifications_per_user=0)
+        db.session.get(User, 2).role = 'user'
+        db.session.commit()
+
+    return app
+
+
+def test_anonymous_requests_are_refused(app):
+    response = app.test_client().get('/metrics')
+
+    assert response.status_code == 401
+    assert response.headers['WWW-Authenticate'].startswith('Bearer')
+    assert 'http_requests_total' not in response.get_data(as_text=True)
+
+
+@pytest.mark.parametrize('header', ['Bearer wrong', f'Basic {TOKEN}', 'Bearer', TOKEN])
+def test_wrong_tokens_are_refused(app, header):
+    assert app.test_client().get('/metrics', headers={'Authorization': header}).status_code == 401
+
+
+def test_bearer_token(app):
+    client = app.test_client()
+    client.get('/login')
+
+    response = client.get('/metrics', headers={'Authorization': f'Bearer {TOKEN}'})
+
+    assert response.status_code == 200
+    assert 'http_requests_total{endpoint="auth.login"}' in response.get_data(as_text=True)
+
+
+def test_needs_manage_system(app, login):
+    user = login(app.test_client(), email='user1@bench.local')
+    assert user.get('/metrics').status_code == 403
+
+    admin = login(app.test_client())
+    response = admin.get('/metrics')
+    assert response.status_code == 200
+    assert 'http_request_duration_seconds' in response.get_data(as_text=True)
+
+
+# Without METRICS_TOKEN only the permission opens the endpoint, an empty bearer token is no token.
+def test_no_token_configured(make_app):
+    app = make_app(METRICS_ENABLED=True)
+
+    assert app.test_client().get('/metrics', headers={'Authorization': 'Bearer '}).status_code == 401
+
+
+def test_disabled_by_default(make_app):
+    assert make_app().test_client().get('/metrics').status_code == 404
@@ -0,0 +1,136 @@
+from decimal import Decimal
+
+import pytest
+
+from sqlalchemy import func, select, text
+
+from database.db import db
+from database.models.invoices import InvoiceItem, Invoices
+from database.types import to_money
+from bench.seed import seed_data
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('0.005', '0.01'),
+    ('0.015', '0.02'),
+    ('2.675', '2.68'),
+    ('-0.005', '-0.01'),
+    (1.005, '1.01'),
+    (7, '7.00'),
+    (Decimal('19.994'), '19.99'),
+])
+def test_to_money_rounds_half_up_to_cents(value, expected):
+    assert to_money(value) == Decimal(expected)
+    assert str(to_money(value)) == expected
+
+
+def test_money_column_reads_back_decimal(make_app):
+    app = make_app()
+
+    with app.app_context():
+        seed_data(users=1, invoices_per_user=1, items_per_invoice=0, todos_per_user=0,
+                  events_per_user=0, availability_per_user=0, notifications_per_user=0)
+        invoice = db.session.get(Invoices, 1)
+        invoice.add_item(name='a', price='0.105', quantity=3)
+        invoice.add_item(name='b', price=0.1, quantity=1)
+        db.session.commit()
+        db.session.expire_all()
+
+        prices = db.session.scalars(select(InvoiceItem.price).order_by(InvoiceItem.id)).all()
+        assert prices == [Decimal('0.11'), Decimal('0.10')]
+        assert all(isinstance(price, Decimal) for price in prices)
+        assert db.session.get(Invoices, 1).total == Decimal('0.43')
+
+
+def _upload(client, price, qty='1'):
+    return client.post('/invoice-upload', data={
+        'title': 'Upload', 'date': '2024-05-01', 'from': '1 Test Street',
+        'item_name[]': ['Thing'], 'item_price[]': [price], 'item_qty[]': [qty],
+    })
+
+
+def test_upload_rounds_prices(make_app, login):
+    app = make_app()
+    with app.app_context():
+        seed_data(users=1, invoices_per_user=0, items_per_invoice=0, todos_per_user=0,
+                  events_per_user=0, availability_per_user=0, notifications_per_user=0)
+
+    client = login(app.test_client())
+    assert _upload(client, '10.005', '2').status_code == 302
+
+    with app.app_context():
+        invoice = db.session.scalars(select(Invoices)).one()
+        assert invoice.items[0].price == Decimal('10.01')
+        assert invoice.total == Decimal('20.02')
+        assert invoice.item_count == 1
+
+
+@pytest.mark.parametrize('price', ['1e400', 'NaN', 'Infinity', '-1', 'abc', ''])
+def test_upload_rejects_invalid_prices(make_app, login, price):
+    app = make_app()
+    with app.app_context():
+        seed_data(users=1, invoices_per_user=0, items_per_invoice=0, todos_per_user=0,
+                  events_per_user=0, availability_per_user=0, notifications_per_user=0)
+
+    client = login(app.test_client())
+    response = _upload(client, price)
+
+    assert response.status_code == 400
+    assert response.get_json()['status'] == 'error'
+
+    with app.app_context():
+        assert db.session.scalar(select(func.count(Invoices.id))) == 0
+
+
+def test_upload_rejects_invalid_quantity(make_app, login):
+    app = make_app()
+    with app.app_context():
+        seed_data(users=1, invoices_per_user=0, items_per_invoice=0, todos_per_user=0,
+                  events_per_user=0, availability_per_user=0, notifications_per_user=0)
+
+    client = login(app.test_client())
+    assert _upload(client, '5', 'two').status_code == 400
+
+
+# A database from before Invoices.total existed gets the columns on startup, filled from the items.
+def test_totals_backfilled_on_existing_database(make_app):
+    app = make_app()
+
+    with app.app_context():
+        seed_data(users=3, invoices_per_user=4, items_per_invoice=3, todos_per_user=0,
+                  events_per_user=0, availability_per_user=0, notifications_per_user=0)
+        expected = dict(db.session.execute(
+            select(InvoiceItem.invoice_id, func.sum(InvoiceItem.price * InvoiceItem.quantity))
+            .group_by(InvoiceItem.invoice_id)
+        ).all())
+
+        with db.engine.begin() as conn:
+            conn.execute(text('ALTER TABLE invoices DROP COLUMN total'))
+            conn.execute(text('ALTER TABLE invoices DROP COLUMN item_count'))
+
+    app = make_app()
+
+    with app.app_context():
+        invoices = db.session.scalars(select(Invoices)).all()
+
+        assert len(invoices) == 12
+        for invoice in invoices:
+            assert invoice.total == to_money(expected[invoice.id])
+            assert invoice.item_count == 3
+
+
+def test_backfill_totals_command(make_app):
+    app = make_app()
+
+    with app.app_context():
+        seed_data(users=2, invoices_per_user=2, items_per_invoice=2, todos_per_user=0,
+                  events_per_user=0, availability_per_user=0, notifications_per_user=0)
+        db.session.execute(text('UPDATE invoices SET total = 0, item_count = 0'))
+        db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=['invoices', 'backfill-totals'])
+    assert 'Updated 4 invoices.' in result.output
+
+    with app.app_context():
+        assert all(invoice.total > 0 and invoice.item_count == 2
+                   for invoice in db.session.scalars(select(Invoices)))
@@ -0,0 +1,43 @@
+import pytest
+
+from sqlalchemy.exc import OperationalError
+
+from database.db import db
+from database.querylog import assert_query_budget
+from bench.seed import seed_data
+
+# Statements per page, the same for 10 or 10,000 users. A loop that queries per row breaks them at once.
+BUDGETS = {
+    '/team': 6,
+    '/admin': 12,
+    '/invoices': 4,
+    '/todo': 4,
+    '/calendar': 3,
+    '/profile': 3,
+}
+
+
+@pytest.fixture
+def client(make_app, login):
+    app = make_app(QUERY_LOG_ENABLED=True)
+
+    with app.app_context():
+        seed_data(users=30, invoices_per_user=3, items_per_invoice=2, todos_per_user=2,
+                  events_per_user=2, availability_per_user=2, notifications_per_user=2)
+
+    return login(app.test_client())
+
+
+@pytest.mark.parametrize('url', sorted(BUDGETS))
+def test_page_query_budget(client, url):
+    assert assert_query_budget(client, url, BUDGETS[url]).status_code == 200
+
+
+def test_failed_statement_leaves_no_start_time(make_app):
+    app = make_app(QUERY_LOG_ENABLED=True)
+
+    with app.app_context(), db.engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.exec_driver_sql('SELECT * FROM no_such_table')
+
+        assert not conn.info.get('querylog_started')
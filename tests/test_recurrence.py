@@ -0,0 +1,99 @@
+from datetime import date
+
+import pytest
+
+from database.db import db
+from database.models.events import Event
+from database.recurrence import last_occurrence, normalize_rrule, occurrences, parse_rrule
+from bench.seed import seed_data
+
+YEAR = (date(2026, 1, 1), date(2026, 12, 31))
+
+
+def _days(*values):
+    return tuple(date.fromisoformat(value) for value in values)
+
+
+def test_count_includes_occurrences_before_the_window():
+    start = date(2026, 1, 5)
+    rule = 'FREQ=WEEKLY;COUNT=4'
+
+    assert occurrences(start, rule, None, *YEAR) == _days('2026-01-05', '2026-01-12', '2026-01-19', '2026-01-26')
+    assert occurrences(start, rule, None, date(2026, 1, 20), date(2026, 3, 1)) == _days('2026-01-26')
+    assert last_occurrence(start, rule) == date(2026, 1, 26)
+
+
+def test_exdates_still_use_up_count():
+    assert occurrences(date(2026, 1, 1), 'FREQ=DAILY;COUNT=3', '2026-01-02', *YEAR) == _days('2026-01-01', '2026-01-03')
+
+
+def test_until_is_inclusive():
+    rule = 'FREQ=DAILY;INTERVAL=2;UNTIL=20260107'
+
+    assert occurrences(date(2026, 1, 1), rule, None, *YEAR) == _days('2026-01-01', '2026-01-03', '2026-01-05', '2026-01-07')
+    assert last_occurrence(date(2026, 1, 1), rule) == date(2026, 1, 7)
+
+
+def test_monthly_on_the_31st_skips_short_months():
+    start = date(2026, 1, 31)
+
+    assert occurrences(start, 'FREQ=MONTHLY', None, date(2026, 1, 1), date(2026, 8, 31)) == \
+        _days('2026-01-31', '2026-03-31', '2026-05-31', '2026-07-31', '2026-08-31')
+    # Skipped months don't count.
+    assert last_occurrence(start, 'FREQ=MONTHLY;COUNT=3') == date(2026, 5, 31)
+
+
+def test_window_clips_open_series():
+    start = date(2020, 1, 6)
+    days = occurrences(start, 'FREQ=WEEKLY', None, date(2026, 3, 1), date(2026, 3, 31))
+
+    assert days == _days('2026-03-02', '2026-03-09', '2026-03-16', '2026-03-23', '2026-03-30')
+    assert occurrences(start, 'FREQ=WEEKLY', None, date(2019, 1, 1), date(2020, 1, 5)) == ()
+    assert last_occurrence(start, 'FREQ=WEEKLY') is None
+
+
+def test_single_events():
+    assert occurrences(date(2026, 2, 1), None, None, *YEAR) == _days('2026-02-01')
+    assert occurrences(date(2027, 2, 1), None, None, *YEAR) == ()
+
+
+@pytest.mark.parametrize('rule', ['FREQ=YEARLY', 'FREQ=DAILY;BYDAY=MO', 'FREQ=DAILY;COUNT=2;UNTIL=20260101',
+                                  'FREQ=DAILY;INTERVAL=0', 'FREQ=DAILY;COUNT=0', 'FREQ=DAILY;FREQ=WEEKLY', 'COUNT=3'])
+def test_unsupported_rules(rule):
+    with pytest.raises(ValueError):
+        parse_rrule(rule)
+
+
+def test_rules_are_normalized():
+    assert normalize_rrule('rrule:freq=weekly;interval=1;until=20260301T000000Z') == 'FREQ=WEEKLY;UNTIL=20260301'
+
+
+def test_removing_one_occurrence(make_app, login):
+    app = make_app()
+
+    with app.app_context():
+        seed_data(users=1, invoices_per_user=0, items_per_invoice=0, events_per_user=0)
+        db.session.execute(db.delete(Event))
+        db.session.commit()
+
+    client = login(app.test_client())
+    client.post('/events/save', json={'events': [{'title': 'Standup', 'start': '2026-03-02', 'rrule': 'FREQ=WEEKLY;COUNT=3'}]})
+
+    def listed():
+        return [event['start_date'] for event in client.get('/events/get?start=2026-03-01&end=2026-03-31').json]
+
+    assert listed() == ['2026-03-02', '2026-03-09', '2026-03-16']
+
+    with app.app_context():
+        event_id = db.session.scalar(db.select(Event.id))
+
+    assert client.post('/events/remove', json={'event_id': event_id, 'date': '2026-03-09'}).json['status'] == 'success'
+    assert listed() == ['2026-03-02', '2026-03-16']
+
+    with app.app_context():
+        assert db.session.get(Event, event_id).exdates == '2026-03-09'
+
+    assert client.post('/events/remove', json={'event_id': event_id, 'date': 'soon'}).status_code == 400
+
+    client.post('/events/remove', json={'event_id': event_id})
+    assert listed() == []
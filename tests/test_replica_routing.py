@@ -0,0 +1,64 @@
+import sqlite3
+import time
+
+from database.backup import sync_replica
+from database.db import db
+from database.routing import REPLICA_BIND
+from bench.seed import seed_data
+
+LAG = 0.3
+
+
+def _name(path, user_id):
+    with sqlite3.connect(path) as conn:
+        return conn.execute('SELECT name FROM user WHERE id = ?', (user_id,)).fetchone()[0]
+
+
+def _replica_app(make_app, tmp_path):
+    return make_app(DATABASE_REPLICA_URL=f'sqlite:///{tmp_path / "replica.db"}',
+                    REPLICA_LAG_SECONDS=LAG,
+                    FRAGMENT_CACHE_ENABLED=False)
+
+
+def test_replica_schema_is_created_at_startup(make_app, tmp_path, login):
+    app = _replica_app(make_app, tmp_path)
+
+    with sqlite3.connect(tmp_path / 'replica.db') as conn:
+        tables = {name for name, in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+    assert {'user', 'roles', 'invoices'} <= tables
+    assert app.test_client().get('/login').status_code == 200
+
+
+def test_reads_go_to_replica_and_writes_to_primary(make_app, tmp_path, login):
+    app = _replica_app(make_app, tmp_path)
+    primary, replica = tmp_path / 'primary.db', tmp_path / 'replica.db'
+
+    with app.app_context():
+        seed_data(users=3, invoices_per_user=1, items_per_invoice=1, todos_per_user=1,
+                  events_per_user=1, availability_per_user=1, notifications_per_user=1)
+        sync_replica(REPLICA_BIND)
+        db.engines[REPLICA_BIND].dispose()
+
+    # Tell the two databases apart: user 2 has another name on the replica.
+    with sqlite3.connect(replica) as conn:
+        conn.execute("UPDATE user SET name = 'on-replica' WHERE id = 2")
+
+    client = login(app.test_client())
+    time.sleep(LAG * 2)
+
+    page = client.get('/team').get_data(as_text=True)
+    assert 'on-replica' in page and 'bench-1' not in page
+
+    response = client.post('/edit-profile', data={'name': 'written', 'bio': 'bio', 'email': 'admin@bench.local'})
+    assert response.status_code == 302
+    assert _name(primary, 1) == 'written'
+    assert _name(replica, 1) == 'bench-admin'
+
+    # Read after write: this browser session stays on the primary for REPLICA_LAG_SECONDS.
+    page = client.get('/team').get_data(as_text=True)
+    assert 'bench-1' in page and 'on-replica' not in page
+    assert 'written' in client.get('/profile').get_data(as_text=True)
+
+    time.sleep(LAG * 2)
+    assert 'on-replica' in client.get('/team').get_data(as_text=True)
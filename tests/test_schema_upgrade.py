@@ -0,0 +1,57 @@
+from sqlalchemy import inspect, select, text
+
+from database.db import db
+from database.models.invoices import Invoices
+from database.models.roles import Roles
+from bench.seed import seed_data
+
+
+def columns(table):
+    return {column['name'] for column in inspect(db.engine).get_columns(table)}
+
+
+def test_startup_upgrade_can_be_turned_off(make_app):
+    app = make_app(UPGRADE_ON_STARTUP=False)
+
+    with app.app_context():
+        assert inspect(db.engine).get_table_names() == []
+
+    result = app.test_cli_runner().invoke(args=['upgrade-db'])
+    assert result.exit_code == 0, result.output
+    assert 'Database is up to date.' in result.output
+
+    with app.app_context():
+        assert 'invoices' in inspect(db.engine).get_table_names()
+        assert set(db.session.scalars(select(Roles.name))) == {'admin', 'founder', 'user'}
+
+
+# A worker started with the upgrades off leaves an old schema alone, upgrade-db brings it up to date once.
+def test_upgrade_command_upgrades_existing_database(make_app):
+    app = make_app()
+
+    with app.app_context():
+        seed_data(users=2, invoices_per_user=2, items_per_invoice=2, todos_per_user=0,
+                  events_per_user=0, availability_per_user=0, notifications_per_user=0)
+
+        with db.engine.begin() as conn:
+            conn.execute(text('ALTER TABLE invoices DROP COLUMN total'))
+            conn.execute(text('ALTER TABLE invoices DROP COLUMN item_count'))
+
+    worker = make_app(UPGRADE_ON_STARTUP=False)
+
+    with worker.app_context():
+        assert 'total' not in columns('invoices')
+
+    assert worker.test_cli_runner().invoke(args=['upgrade-db']).exit_code == 0
+
+    with worker.app_context():
+        assert {'total', 'item_count'} <= columns('invoices')
+        assert all(invoice.total > 0 and invoice.item_count == 2
+                   for invoice in db.session.scalars(select(Invoices)))
+
+    # Running it again changes nothing.
+    assert worker.test_cli_runner().invoke(args=['upgrade-db']).exit_code == 0
+
+    with worker.app_context():
+        assert db.session.scalar(select(Roles.id).where(Roles.name == 'admin')) is not None
+        assert len(db.session.scalars(select(Roles)).all()) == 4
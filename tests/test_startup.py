@@ -0,0 +1,23 @@
+import os
+
+import pytest
+
+from bench.importtime import import_times
+from bench.startup import WATCHED_MODULES, measure
+
+
+# The modules in WATCHED_MODULES are imported lazily by the routes that need them, a cold start must not load them.
+def test_cold_start_stays_lazy():
+    sample, = measure(1, 'sqlite://')
+    assert sample['loaded'] == []
+
+    eager = [name for name in import_times('main') if name.split('.')[0] in WATCHED_MODULES]
+    assert eager == []
+
+
+# Timings depend on the machine, the budget only applies where STARTUP_BUDGET_MS is set (e.g. on CI).
+@pytest.mark.skipif(not os.environ.get('STARTUP_BUDGET_MS'), reason='STARTUP_BUDGET_MS is not set')
+def test_cold_start_budget():
+    samples = measure(3, 'sqlite://')
+    median = sorted(sample['total_ms'] for sample in samples)[1]
+    assert median <= float(os.environ['STARTUP_BUDGET_MS'])
